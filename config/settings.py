@@ -393,6 +393,12 @@ class CacheConfig:
     MAX_CACHE_SIZE = 100
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     CACHE_PREFIX = "prompt_optimizer:"
+    
+    # 语义缓存（需要安装 sentence-transformers）
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
 
 class LogConfig:
     """日志配置"""
@@ -402,8 +408,16 @@ class LogConfig:
     FILE_PATH = "logs/app.log"
     MAX_FILE_SIZE = "10MB"
     BACKUP_COUNT = 5
+    # 滚动后的备份文件压缩为 .gz
+    COMPRESS_BACKUPS = True
     LOG_API_CALLS = True
     LOG_USER_ACTIONS = True
+    # 是否输出到控制台，生产环境默认关闭（调试模式或无文件日志时始终输出）
+    CONSOLE_ENABLED = os.getenv(
+        "LOG_CONSOLE_ENABLED", str(AppConfig.ENV != Environment.PRODUCTION)
+    ).lower() == "true"
+    # 性能指标的二进制输出文件，留空则写入文本日志
+    PERF_BINARY_PATH = os.getenv("LOG_PERF_BINARY_PATH", "")
 
 class DatabaseConfig:
     """数据库配置"""
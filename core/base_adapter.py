@@ -3,13 +3,14 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List
 
 from core.models import (
-    ModelProvider, GenerationConfig, ModelResponse, ModelInfo, ConnectionStatus
+    ModelProvider, GenerationConfig, ModelResponse, ModelInfo, ConnectionStatus,
+    DEFAULT_GENERATION_CONFIG
 )
 from config.settings import ConfigValidator
-from utils.exceptions import ConfigurationError
+from utils.exceptions import ConfigurationError, ModelError
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -57,6 +58,14 @@ class BaseModelAdapter(ABC):
         """异步聊天对话"""
         pass
     
+    async def generate_stream(self, prompt: str, config: Optional[GenerationConfig] = None) -> AsyncIterator[str]:
+        """流式生成文本，默认实现等待完整结果后一次性产出"""
+        response = await self.generate_async(prompt, config)
+        if not response.success:
+            raise ModelError(f"模型调用失败: {response.error}")
+        if response.content:
+            yield response.content
+    
     def _merge_config(self, config: Optional[GenerationConfig]) -> GenerationConfig:
         """合并配置"""
         # 从模型配置获取默认参数
@@ -71,7 +80,7 @@ class BaseModelAdapter(ABC):
         
         # 应用模型默认参数
         for key, value in default_params.items():
-            if hasattr(merged, key) and getattr(merged, key) == getattr(GenerationConfig(), key):
+            if hasattr(merged, key) and getattr(merged, key) == getattr(DEFAULT_GENERATION_CONFIG, key):
                 setattr(merged, key, value)
         
         return merged
@@ -4,7 +4,7 @@
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List, Union
+from typing import AsyncIterator, Dict, Any, Optional, List, Union
 from abc import ABC, abstractmethod
 import traceback
 
@@ -13,7 +13,7 @@ from core.models import (
 )
 from core.base_adapter import BaseModelAdapter
 from config.settings import ConfigValidator
-from utils.exceptions import ModelError, ConfigurationError, ConnectionError
+from utils.exceptions import ModelError, ConfigurationError
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -136,6 +136,23 @@ class UniversalModelClient:
             self.logger.error(f"异步文本生成失败: {str(e)}")
             raise ModelError(f"异步文本生成失败: {str(e)}")
     
+    async def generate_stream(self,
+                              prompt: str,
+                              provider: Optional[Union[str, ModelProvider]] = None,
+                              model_name: Optional[str] = None,
+                              config: Optional[GenerationConfig] = None) -> AsyncIterator[str]:
+        """流式生成文本，逐段产出增量文本"""
+        adapter = self._resolve_adapter(provider, model_name)
+        
+        try:
+            self.logger.info(f"开始流式生成文本: {adapter.provider.value}:{adapter.model_name}")
+            async for chunk in adapter.generate_stream(prompt, config):
+                yield chunk
+            self.logger.info("流式文本生成完成")
+        except Exception as e:
+            self.logger.error(f"流式文本生成失败: {str(e)}")
+            raise ModelError(f"流式文本生成失败: {str(e)}")
+    
     def chat(self,
              messages: List[Dict[str, str]],
              provider: Optional[Union[str, ModelProvider]] = None,
@@ -7,6 +7,7 @@ from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
 from enum import Enum
 import json
+import time
 
 class ModelProvider(Enum):
     """模型提供商枚举"""
@@ -59,6 +60,9 @@ class GenerationConfig:
         """从字典创建配置"""
         return cls(**{k: v for k, v in data.items() if hasattr(cls, k)})
 
+# 共享的默认生成配置，仅供只读使用，需要修改时请创建新实例
+DEFAULT_GENERATION_CONFIG = GenerationConfig()
+
 @dataclass
 class ModelInfo:
     """模型信息数据类"""
@@ -162,7 +166,13 @@ class OptimizationResult:
     response: ModelResponse
     metrics: Dict[str, float] = field(default_factory=dict)
     task_id: Optional[str] = None
-    created_at: datetime = field(default_factory=datetime.now)
+    template_used: str = ""
+    created_at_epoch: float = field(default_factory=time.time)
+    
+    @property
+    def created_at(self) -> datetime:
+        """创建时间，由时间戳按需转换"""
+        return datetime.fromtimestamp(self.created_at_epoch)
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -173,6 +183,7 @@ class OptimizationResult:
             "response": self.response.to_dict(),
             "metrics": self.metrics,
             "task_id": self.task_id,
+            "template_used": self.template_used,
             "created_at": self.created_at.isoformat()
         }
     
@@ -181,8 +192,11 @@ class OptimizationResult:
         """从字典创建结果"""
         data["request"] = OptimizationRequest.from_dict(data["request"])
         data["response"] = ModelResponse.from_dict(data["response"])
-        if isinstance(data.get("created_at"), str):
-            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        created_at = data.pop("created_at", None)
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if isinstance(created_at, datetime):
+            data["created_at_epoch"] = created_at.timestamp()
         
         return cls(**data)
 
@@ -318,7 +332,7 @@ class UserSession:
     def get_recent_optimizations(self, limit: int = 10) -> List[OptimizationResult]:
         """获取最近的优化记录"""
         return sorted(self.optimization_history, 
-                     key=lambda x: x.created_at, reverse=True)[:limit]
+                     key=lambda x: x.created_at_epoch, reverse=True)[:limit]
     
     def get_recent_tests(self, limit: int = 10) -> List[TestResult]:
         """获取最近的测试记录"""
@@ -407,6 +421,7 @@ __all__ = [
     "OptimizationType", 
     "TaskStatus",
     "GenerationConfig",
+    "DEFAULT_GENERATION_CONFIG",
     "ModelInfo",
     "ModelResponse",
     "OptimizationRequest",
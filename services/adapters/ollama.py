@@ -3,8 +3,10 @@ Ollama模型适配器
 """
 
 import asyncio
+import atexit
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
@@ -13,11 +15,21 @@ from core.models import (
     ModelProvider, GenerationConfig, ModelResponse, ModelInfo, ConnectionStatus
 )
 from config.settings import ConfigValidator, ModelConfig
-from utils.exceptions import ConnectionError, ModelError, TimeoutError
+from utils.exceptions import PromptConnectionError, ModelError
 from utils.logger import get_logger, log_api_call
 
 logger = get_logger(__name__)
 
+# 同步HTTP调用专用线程池，按I/O并发量配置，避免占用事件循环的默认执行器
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-io")
+atexit.register(_IO_EXECUTOR.shutdown, wait=False)
+
+
+def _messages_length(args: tuple, kwargs: dict) -> int:
+    """chat 调用日志使用：统计所有消息内容的总字符数（args[0] 为 self）"""
+    messages = args[1] if len(args) > 1 else kwargs.get("messages", ())
+    return sum(len(message.get("content") or "") for message in messages)
+
 class OllamaAdapter(BaseModelAdapter):
     """Ollama模型适配器"""
     
@@ -25,7 +37,7 @@ class OllamaAdapter(BaseModelAdapter):
         super().__init__(ModelProvider.OLLAMA, model_name, config)
         
         if not self.api_config:
-            raise ConnectionError("Ollama API配置未找到")
+            raise PromptConnectionError("Ollama API配置未找到")
         
         self.base_url = self.api_config["base_url"]
         self.api_url = f"{self.base_url}/api"
@@ -135,7 +147,7 @@ class OllamaAdapter(BaseModelAdapter):
             logger.error(f"获取模型列表异常: {str(e)}")
             return []
     
-    @log_api_call("ollama", "model_name")
+    @log_api_call("ollama", "model_name", prompt_arg="prompt")
     def generate(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """生成文本"""
         start_time = time.time()
@@ -231,12 +243,10 @@ class OllamaAdapter(BaseModelAdapter):
     
     async def generate_async(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步生成文本"""
-        # 在实际项目中，这里应该使用aiohttp等异步HTTP库
-        # 这里为简单起见，使用run_in_executor
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate, prompt, config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_IO_EXECUTOR, self.generate, prompt, config)
     
-    @log_api_call("ollama", "model_name")
+    @log_api_call("ollama", "model_name", prompt_arg=_messages_length)
     def chat(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """聊天对话"""
         start_time = time.time()
@@ -328,8 +338,8 @@ class OllamaAdapter(BaseModelAdapter):
     
     async def chat_async(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步聊天对话"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.chat, messages, config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_IO_EXECUTOR, self.chat, messages, config)
     
     def _build_ollama_options(self, config: GenerationConfig) -> Dict[str, Any]:
         """构建Ollama选项"""
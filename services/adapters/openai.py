@@ -1,9 +1,27 @@
-import os
-from typing import Any, Dict, List, Optional
+import asyncio
+import atexit
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 import openai
 from core.base_adapter import BaseModelAdapter
-from core.models import GenerationConfig, ModelProvider, ModelResponse, ConnectionStatus, ModelInfo
+from core.models import DEFAULT_GENERATION_CONFIG, GenerationConfig, ModelProvider, ModelResponse, ConnectionStatus, ModelInfo
 from datetime import datetime
+from utils.cache import LRUCache
+from utils.config import _env, _getenv
+
+# 模型列表缓存: (provider, base_url) -> (模型ID元组, 响应时间)
+MODELS_CACHE_TTL = 60
+_MODELS_CACHE = LRUCache(maxsize=32, ttl=MODELS_CACHE_TTL)
+
+# 同步SDK调用专用线程池，避免占用事件循环的默认执行器
+_OPENAI_EXECUTOR = ThreadPoolExecutor(max_workers=50, thread_name_prefix="openai-adapter")
+atexit.register(_OPENAI_EXECUTOR.shutdown, wait=False)
+
+
+def reload_env():
+    """重新读取 utils/.env 和进程环境变量，仅影响之后创建的适配器"""
+    _env.cache_clear()
 
 
 class OpenAIModelAdapter(BaseModelAdapter):
@@ -18,20 +36,15 @@ class OpenAIModelAdapter(BaseModelAdapter):
             
         super().__init__(provider, model_name, config)
         
-        # 确保环境变量已加载
-        from utils.config import load_dotenv
-        env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'utils', '.env')
-        load_dotenv(env_path)
-        
         # 根据提供商设置不同的API配置
         if self.provider == ModelProvider.OPENAI:
-            api_key = self.api_config.get("api_key") or os.getenv('OPENAI_API_KEY')
+            api_key = self.api_config.get("api_key") or _getenv('OPENAI_API_KEY')
             base_url = self.api_config.get("base_url") or "https://api.openai.com/v1"
         elif self.provider == ModelProvider.DEEPSEEK:
-            api_key = self.api_config.get("api_key") or os.getenv('DEEPSEEK_API_KEY')
-            base_url = self.api_config.get("base_url") or os.getenv('DEEPSEEK_BASE_URL') or "https://api.deepseek.com/v1"
+            api_key = self.api_config.get("api_key") or _getenv('DEEPSEEK_API_KEY')
+            base_url = self.api_config.get("base_url") or _getenv('DEEPSEEK_BASE_URL') or "https://api.deepseek.com/v1"
         elif self.provider == ModelProvider.VLLM:
-            api_key = self.api_config.get("api_key") or os.getenv('VLLM_API_KEY', "")
+            api_key = self.api_config.get("api_key") or _getenv('VLLM_API_KEY', "")
             base_url = self.api_config.get("base_url") or "http://localhost:8000/v1"
         else:
             api_key = self.api_config.get("api_key", "")
@@ -41,33 +54,38 @@ class OpenAIModelAdapter(BaseModelAdapter):
             api_key=api_key,
             base_url=base_url
         )
+        # 异步客户端用于流式输出
+        self.async_client = openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url
+        )
     
-    async def generate_async(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
-        """异步生成文本"""
-        return await self.generate(prompt, config)
-    
-    async def chat_async(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
-        """异步聊天对话"""
-        return await self.chat(messages, config)
+    def _list_model_ids(self, force_refresh: bool = False):
+        """获取模型ID列表，结果按 (provider, base_url) 缓存 MODELS_CACHE_TTL 秒"""
+        key = (self.provider, str(self.client.base_url))
+        if not force_refresh:
+            cached = _MODELS_CACHE.get(key)
+            if cached is not None:
+                return cached
+        
+        start_time = time.time()
+        models = self.client.models.list()
+        entry = (tuple(model.id for model in models.data), time.time() - start_time)
+        _MODELS_CACHE.set(key, entry)
+        return entry
     
-    def check_connection(self) -> ConnectionStatus:
-        """检查连接状态"""
+    def check_connection(self, force_refresh: bool = False) -> ConnectionStatus:
+        """检查连接状态，默认复用未过期的模型列表缓存"""
         try:
-            import time
-            start_time = time.time()
-            
             # 尝试列出模型来测试连接
-            models = self.client.models.list()
-            response_time = time.time() - start_time
-            
-            model_names = [model.id for model in models.data]
+            model_names, response_time = self._list_model_ids(force_refresh)
             
             return ConnectionStatus(
                 provider=self.provider,
                 connected=True,
                 status_message="连接正常",
                 last_check=datetime.now(),
-                models_available=model_names,
+                models_available=list(model_names),
                 response_time=response_time
             )
         except Exception as e:
@@ -81,28 +99,18 @@ class OpenAIModelAdapter(BaseModelAdapter):
     
     def get_available_models(self) -> List[ModelInfo]:
         """获取可用的模型列表"""
+        return list(self.iter_available_models())
+    
+    def iter_available_models(self) -> Iterator[ModelInfo]:
+        """惰性生成可用模型信息，适合只需查找部分模型的调用方"""
         try:
-            models = self.client.models.list()
-            return [
-                ModelInfo(
-                    name=model.id,
-                    display_name=model.id,
-                    provider=self.provider,
-                    description=f"OpenAI {model.id} model",
-                    category="通用对话",
-                    context_length=0,
-                    parameters={},
-                    available=True
-                )
-                for model in models.data
-            ]
-        except Exception as e:
+            model_names, _ = self._list_model_ids()
+        except Exception:
             # 如果无法获取模型列表，返回配置中的模型
             from config.settings import ModelConfig
             provider_config = ModelConfig.MODELS.get(self.provider, {})
-            models = provider_config.get("models", [])
-            return [
-                ModelInfo(
+            for model in provider_config.get("models", []):
+                yield ModelInfo(
                     name=model["name"],
                     display_name=model["display_name"],
                     provider=self.provider,
@@ -112,24 +120,39 @@ class OpenAIModelAdapter(BaseModelAdapter):
                     parameters=model.get("parameters", {}),
                     available=False
                 )
-                for model in models
-            ]
+            return
+        
+        for model_id in model_names:
+            yield ModelInfo(
+                name=model_id,
+                display_name=model_id,
+                provider=self.provider,
+                description=f"OpenAI {model_id} model",
+                category="通用对话",
+                context_length=0,
+                parameters={},
+                available=True
+            )
+    
+    def _build_kwargs(self, messages: List[Dict[str, str]], config: GenerationConfig) -> Dict[str, Any]:
+        """构建 chat.completions.create 的请求参数"""
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "top_p": config.top_p
+        }
     
     def generate(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """生成文本"""
-        import time
         start_time = time.time()
         
-        if not config:
-            config = GenerationConfig()
+        config = config or DEFAULT_GENERATION_CONFIG
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=config.temperature,
-                max_tokens=config.max_tokens,
-                top_p=config.top_p
+                **self._build_kwargs([{"role": "user", "content": prompt}], config)
             )
             
             response_time = time.time() - start_time
@@ -156,26 +179,17 @@ class OpenAIModelAdapter(BaseModelAdapter):
     
     async def generate_async(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步生成文本"""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate, prompt, config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_OPENAI_EXECUTOR, self.generate, prompt, config)
     
     def chat(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """聊天对话"""
-        import time
         start_time = time.time()
         
-        if not config:
-            config = GenerationConfig()
+        config = config or DEFAULT_GENERATION_CONFIG
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                temperature=config.temperature,
-                max_tokens=config.max_tokens,
-                top_p=config.top_p
-            )
+            response = self.client.chat.completions.create(**self._build_kwargs(messages, config))
             
             response_time = time.time() - start_time
             
@@ -201,6 +215,24 @@ class OpenAIModelAdapter(BaseModelAdapter):
     
     async def chat_async(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步聊天对话"""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.chat, messages, config)
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_OPENAI_EXECUTOR, self.chat, messages, config)
+    
+    async def chat_stream(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> AsyncIterator[str]:
+        """流式聊天对话，逐段产出增量文本"""
+        config = config or DEFAULT_GENERATION_CONFIG
+        
+        stream = await self.async_client.chat.completions.create(
+            **self._build_kwargs(messages, config), stream=True
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    
+    async def generate_stream(self, prompt: str, config: Optional[GenerationConfig] = None) -> AsyncIterator[str]:
+        """流式生成文本"""
+        async for delta in self.chat_stream([{"role": "user", "content": prompt}], config):
+            yield delta
\ No newline at end of file
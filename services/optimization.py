@@ -2,28 +2,167 @@
 提示词优化服务 - 使用模板管理器
 """
 
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
+import asyncio
+import dataclasses
+import hashlib
+import json
+import re
 import time
-from datetime import datetime
+from functools import lru_cache
 
 from core.models import (
     OptimizationRequest, OptimizationResult, OptimizationType, 
-    ModelResponse, GenerationConfig
+    ModelProvider, ModelResponse, GenerationConfig, DEFAULT_GENERATION_CONFIG
 )
 from core.client import UniversalModelClient
-from templates.template_manager import template_manager, create_template_context
+from config.settings import AppConfig, CacheConfig
+from templates.template_manager import get_template_manager, create_template_context
+from utils.cache import LRUCache
 from utils.logger import get_logger, api_logger
 from utils.exceptions import ModelError, ValidationError, TemplateError
 
 logger = get_logger(__name__)
 
+# 确定性(temperature=0)优化结果缓存的最大条目数
+RESULT_CACHE_SIZE = 1024
+
+# 流式优化时合并输出片段的最小字符数，避免逐token推送
+STREAM_CHUNK_CHARS = 32
+
+# 批量优化时单次模型调用打包的提示词数量
+BATCH_SIZE = 8
+# 批量输出中的 [序号] 位置标识
+_BATCH_MARKER_PATTERN = re.compile(r"^[ \t]*\[(\d+)\][ \t]*", re.MULTILINE)
+
+# 优化结果中常见的分隔符，按优先级排列
+OPTIMIZED_PROMPT_SEPARATORS = (
+    "优化后的提示词：",
+    "优化后：",
+    "Optimized prompt:",
+    "优化结果：",
+    "改进后：",
+    "---"
+)
+_SEPARATOR_PRIORITY = {sep: i for i, sep in enumerate(OPTIMIZED_PROMPT_SEPARATORS)}
+# 零宽前瞻，一次扫描即可找到所有分隔符的出现位置
+_SEPARATOR_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(sep) for sep in OPTIMIZED_PROMPT_SEPARATORS) + "))"
+)
+
+# 优化指标使用的指标词，按类别分组
+_METRIC_INDICATORS = {
+    "structure": frozenset(["##", "**", "1.", "2.", "-", "步骤", "要求"]),
+    "detail": frozenset(["具体", "详细", "例如", "比如", "包括", "需要", "应该"]),
+    "professional": frozenset(["专业", "专家", "分析", "评估", "考虑", "建议"])
+}
+# 生成建议时额外检查的指标词
+_SUGGESTION_INDICATORS = frozenset(["##", "**", "步骤", "Step", "例如", "比如"])
+_INDICATOR_PATTERN = re.compile(
+    "(?=(" + "|".join(
+        re.escape(word)
+        for word in sorted(
+            _SUGGESTION_INDICATORS.union(*_METRIC_INDICATORS.values()), key=len, reverse=True
+        )
+    ) + "))"
+)
+
+
+# 内容类型检测关键词，按优先级排列
+_CONTENT_TYPE_PATTERNS = (
+    ("code", re.compile(r"代码|编程|算法|函数|code|programming", re.IGNORECASE)),
+    ("writing", re.compile(r"写作|文章|文案|创作|writing|article", re.IGNORECASE)),
+    ("analysis", re.compile(r"分析|数据|研究|评估|analysis|research", re.IGNORECASE))
+)
+
+
+def _scan_indicators(text: str) -> set:
+    """一次扫描文本，返回出现过的指标词集合"""
+    return {match.group(1) for match in _INDICATOR_PATTERN.finditer(text)}
+
+
+# 基于优化类型的建议
+_TYPE_SUGGESTIONS = {
+    OptimizationType.GENERAL: (
+        "提升了整体表达的清晰度和准确性",
+        "增加了必要的上下文信息"
+    ),
+    OptimizationType.STRUCTURED: (
+        "采用了结构化的组织形式",
+        "明确了任务步骤和输出格式"
+    ),
+    OptimizationType.ROLE_BASED: (
+        "引入了专业角色设定",
+        "强化了专业背景和能力描述"
+    ),
+    OptimizationType.TASK_ORIENTED: (
+        "明确了任务目标和期望结果",
+        "增加了具体的执行指导"
+    ),
+    OptimizationType.CREATIVE: (
+        "增强了创意性和想象力引导",
+        "鼓励多元化的思考角度"
+    ),
+    OptimizationType.LOGICAL: (
+        "强化了逻辑推理结构",
+        "增加了分析思考的指导"
+    )
+}
+# 没有任何建议时的默认建议
+_DEFAULT_SUGGESTIONS = ("应用了基于模板的智能优化策略",)
+
+
+@lru_cache(maxsize=256)
+def _suggestions_for(optimization_type: OptimizationType, expansion: int,
+                     has_markdown: bool, has_steps: bool, has_examples: bool) -> Tuple[str, ...]:
+    """按优化类型和内容特征生成建议，结果只取决于这些离散输入，可直接缓存"""
+    suggestions = list(_TYPE_SUGGESTIONS.get(optimization_type, ()))
+    
+    # 基于内容变化的建议
+    if expansion == 2:
+        suggestions.append("显著扩展了提示词的详细程度")
+    elif expansion == 1:
+        suggestions.append("适度增加了指导信息")
+    
+    # 检查结构化元素
+    if has_markdown:
+        suggestions.append("使用了Markdown格式增强可读性")
+    
+    if has_steps:
+        suggestions.append("添加了步骤化的执行指导")
+    
+    if has_examples:
+        suggestions.append("提供了具体的示例说明")
+    
+    return tuple(suggestions) if suggestions else _DEFAULT_SUGGESTIONS
+
 
 class OptimizationService:
     """提示词优化服务"""
     
     def __init__(self):
         self.client = UniversalModelClient()
-        self.template_manager = template_manager
+        self.template_manager = get_template_manager()
+        self._cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self._stats = {"hits": 0, "misses": 0, "semantic_hits": 0}
+        self._semantic_cache = self._create_semantic_cache()
+        
+    def _create_semantic_cache(self):
+        """按配置创建语义缓存，未启用或依赖缺失时返回None"""
+        if not CacheConfig.SEMANTIC_CACHE_ENABLED:
+            return None
+        
+        try:
+            from services.semantic_cache import SemanticCache
+            return SemanticCache(
+                model=CacheConfig.SEMANTIC_CACHE_MODEL,
+                threshold=CacheConfig.SEMANTIC_CACHE_THRESHOLD,
+                ttl=CacheConfig.CACHE_TTL,
+                max_entries=CacheConfig.SEMANTIC_CACHE_MAX_ENTRIES
+            )
+        except Exception as e:
+            logger.warning(f"语义缓存不可用，已跳过: {str(e)}")
+            return None
         
     def optimize_prompt(self, request: OptimizationRequest) -> OptimizationResult:
         """
@@ -39,30 +178,14 @@ class OptimizationService:
             # 验证请求
             self._validate_request(request)
             
-            # 记录API调用
-            api_logger.log_request(
-                provider=request.model_provider.value,
-                model=request.model_name,
-                prompt_length=len(request.original_prompt)
-            )
-            
-            # 创建模板上下文
-            context = create_template_context(
-                original_prompt=request.original_prompt,
-                custom_instructions=request.custom_instructions
-            )
-            
-            # 获取优化提示词模板
-            optimization_prompt = self.template_manager.get_optimization_template(
-                optimization_type=request.optimization_type.value,
-                context=context
-            )
+            cache_key = self._make_cache_key(request)
+            cached = self._lookup_cache(request, cache_key)
+            if cached is not None:
+                return cached
             
-            # 优化提示词生成完成
+            optimization_prompt = self._build_optimization_prompt(request)
             
             # 调用模型进行优化
-            start_time = time.time()
-            
             response = self.client.generate(
                 prompt=optimization_prompt,
                 provider=request.model_provider,
@@ -70,10 +193,99 @@ class OptimizationService:
                 config=request.generation_config
             )
             
-            # 记录API响应
+            return self._build_result(request, response, cache_key)
+            
+        except TemplateError as e:
+            logger.error(f"模板处理失败: {str(e)}")
+            raise
+        except Exception as e:
+            return self._build_error_result(request, e)
+    
+    def batch_optimize_prompts(self,
+                               prompts: List[str],
+                               optimization_type: OptimizationType,
+                               model_provider: ModelProvider,
+                               model_name: str,
+                               generation_config: Optional[GenerationConfig] = None,
+                               custom_instructions: Optional[str] = None) -> List[OptimizationResult]:
+        """
+        批量优化提示词，每 BATCH_SIZE 个提示词打包为一次模型调用
+        
+        Args:
+            prompts: 原始提示词列表
+            optimization_type: 优化类型
+            model_provider: 模型提供商
+            model_name: 模型名称
+            generation_config: 生成配置
+            custom_instructions: 自定义指令
+            
+        Returns:
+            与输入顺序一致的优化结果列表
+        """
+        requests = [
+            OptimizationRequest(
+                original_prompt=prompt,
+                optimization_type=optimization_type,
+                model_provider=model_provider,
+                model_name=model_name,
+                generation_config=generation_config,
+                custom_instructions=custom_instructions
+            )
+            for prompt in prompts
+        ]
+        
+        # 单个提示词无需打包
+        if len(requests) == 1:
+            return [self.optimize_prompt(requests[0])]
+        
+        results: List[Optional[OptimizationResult]] = [None] * len(requests)
+        pending = []
+        for i, request in enumerate(requests):
+            try:
+                self._validate_request(request)
+                cache_key = self._make_cache_key(request)
+                cached = self._lookup_cache(request, cache_key)
+            except Exception as e:
+                results[i] = self._build_error_result(request, e)
+                continue
+            
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, request, cache_key))
+        
+        for start in range(0, len(pending), BATCH_SIZE):
+            self._run_batch(pending[start:start + BATCH_SIZE], results)
+        
+        return results
+    
+    def _run_batch(self, batch: List[Tuple[int, OptimizationRequest, Optional[str]]],
+                   results: List[Optional[OptimizationResult]]):
+        """执行一次打包的模型调用，并将拆分后的结果写回 results"""
+        first = batch[0][1]
+        try:
+            batch_prompt = self._build_batch_template(
+                [request.original_prompt for _, request, _ in batch],
+                first.optimization_type,
+                first.custom_instructions
+            )
+            
+            api_logger.log_request(
+                provider=first.model_provider.value,
+                model=first.model_name,
+                prompt_length=len(batch_prompt)
+            )
+            
+            response = self.client.generate(
+                prompt=batch_prompt,
+                provider=first.model_provider,
+                model_name=first.model_name,
+                config=first.generation_config
+            )
+            
             api_logger.log_response(
-                provider=request.model_provider.value,
-                model=request.model_name,
+                provider=first.model_provider.value,
+                model=first.model_name,
                 success=response.success,
                 response_time=response.response_time,
                 tokens_used=response.tokens_used
@@ -82,67 +294,307 @@ class OptimizationService:
             if not response.success:
                 raise ModelError(f"模型调用失败: {response.error}")
             
-            # 处理优化结果
-            optimized_prompt = self._extract_optimized_prompt(response.content)
-            suggestions = self._generate_suggestions(
-                request.original_prompt,
-                optimized_prompt,
-                request.optimization_type
-            )
+        except Exception as e:
+            for i, request, _ in batch:
+                results[i] = self._build_error_result(request, e)
+            return
+        
+        outputs = self._split_batch_output(response.content)
+        for position, (i, request, cache_key) in enumerate(batch, 1):
+            try:
+                if position not in outputs:
+                    raise ModelError(f"批量输出缺少第 {position} 项")
+                item_response = dataclasses.replace(response, content=outputs[position])
+                results[i] = self._build_result(request, item_response, cache_key, log_response=False)
+            except Exception as e:
+                results[i] = self._build_error_result(request, e)
+    
+    def _build_batch_template(self, prompts: List[str],
+                              optimization_type: OptimizationType,
+                              custom_instructions: Optional[str] = None) -> str:
+        """构建批量优化提示词，各原始提示词以 [序号] 标识"""
+        numbered = "\n\n".join(f"[{i}] {prompt}" for i, prompt in enumerate(prompts, 1))
+        
+        context = create_template_context(
+            original_prompt=numbered,
+            custom_instructions=custom_instructions,
+            prompt=numbered
+        )
+        template = self.template_manager.get_optimization_template(
+            optimization_type=optimization_type.value,
+            context=context
+        )
+        
+        return (
+            f"{template.rstrip()}\n\n"
+            f"以上共有 {len(prompts)} 个原始提示词，分别以 [1] 到 [{len(prompts)}] 标识。"
+            f"请逐一优化，并按相同顺序输出：每个优化后的提示词以单独一行的 [序号] 开头，"
+            f"序号与原始提示词一致，不要输出其他内容。"
+        )
+    
+    @staticmethod
+    def _split_batch_output(content: str) -> Dict[int, str]:
+        """按 [序号] 标识拆分批量输出"""
+        matches = list(_BATCH_MARKER_PATTERN.finditer(content))
+        outputs = {}
+        for current, following in zip(matches, matches[1:] + [None]):
+            end = following.start() if following else len(content)
+            index = int(current.group(1))
+            if index not in outputs:
+                outputs[index] = content[current.end():end].strip()
+        return outputs
+    
+    async def optimize_prompts_batch(self,
+                                     requests: List[OptimizationRequest],
+                                     max_concurrent: Optional[int] = None) -> List[OptimizationResult]:
+        """
+        并发批量优化提示词
+        
+        Args:
+            requests: 优化请求列表
+            max_concurrent: 最大并发模型调用数，默认取 AppConfig.MAX_CONCURRENT_REQUESTS
             
-            # 计算性能指标
-            metrics = self._calculate_metrics(
-                original=request.original_prompt,
-                optimized=optimized_prompt,
-                optimization_type=request.optimization_type
-            )
+        Returns:
+            与请求顺序一致的优化结果列表
+        """
+        semaphore = asyncio.Semaphore(max_concurrent or AppConfig.MAX_CONCURRENT_REQUESTS)
+        tasks = [asyncio.create_task(self._optimize_async(request, semaphore)) for request in requests]
+        return await asyncio.gather(*tasks)
+    
+    async def _optimize_async(self,
+                              request: OptimizationRequest,
+                              semaphore: Optional[asyncio.Semaphore] = None) -> OptimizationResult:
+        """optimize_prompt 的异步版本，模型调用受信号量限流"""
+        try:
+            self._validate_request(request)
             
-            # 创建结果对象
-            result = OptimizationResult(
-                request=request,
-                optimized_prompt=optimized_prompt,
-                suggestions=suggestions,
-                response=response,
-                metrics=metrics,
-                template_used=f"optimization/{request.optimization_type.value}.md",
-                created_at=datetime.now()
-            )
+            cache_key = self._make_cache_key(request)
+            cached = self._lookup_cache(request, cache_key)
+            if cached is not None:
+                return cached
+            
+            optimization_prompt = self._build_optimization_prompt(request)
+            
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(AppConfig.MAX_CONCURRENT_REQUESTS)
+            async with semaphore:
+                response = await self.client.generate_async(
+                    prompt=optimization_prompt,
+                    provider=request.model_provider,
+                    model_name=request.model_name,
+                    config=request.generation_config
+                )
             
-            logger.info(f"提示词优化完成: {request.optimization_type.value}")
-            return result
+            return self._build_result(request, response, cache_key)
             
         except TemplateError as e:
             logger.error(f"模板处理失败: {str(e)}")
             raise
         except Exception as e:
-            logger.error(f"提示词优化失败: {str(e)}")
+            return self._build_error_result(request, e)
+    
+    async def optimize_prompt_stream(self,
+                                     request: OptimizationRequest) -> AsyncIterator[Union[str, OptimizationResult]]:
+        """
+        流式优化提示词
+        
+        Args:
+            request: 优化请求
             
-            # 记录错误
-            api_logger.log_error(
-                provider=request.model_provider.value,
-                model=request.model_name,
-                error=str(e)
-            )
+        Yields:
+            模型输出的文本片段（合并至约 STREAM_CHUNK_CHARS 个字符），
+            最后一项为完整的 OptimizationResult；命中缓存时只产出结果
+        """
+        try:
+            self._validate_request(request)
+            
+            cache_key = self._make_cache_key(request)
+            cached = self._lookup_cache(request, cache_key)
+            if cached is not None:
+                yield cached
+                return
             
-            # 返回失败结果
-            error_response = ModelResponse(
-                content="",
+            optimization_prompt = self._build_optimization_prompt(request)
+            
+            start_time = time.time()
+            parts = []
+            buffer = []
+            buffered = 0
+            async for delta in self.client.generate_stream(
+                prompt=optimization_prompt,
+                provider=request.model_provider,
+                model_name=request.model_name,
+                config=request.generation_config
+            ):
+                parts.append(delta)
+                buffer.append(delta)
+                buffered += len(delta)
+                if buffered >= STREAM_CHUNK_CHARS:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    buffered = 0
+            if buffer:
+                yield "".join(buffer)
+            
+            response = ModelResponse(
+                content="".join(parts),
                 model=request.model_name,
                 provider=request.model_provider.value,
-                success=False,
-                response_time=0.0,
-                error=str(e)
+                success=True,
+                response_time=time.time() - start_time
             )
+            result = self._build_result(request, response, cache_key)
             
-            return OptimizationResult(
-                request=request,
-                optimized_prompt="",
-                suggestions=[],
-                response=error_response,
-                metrics={},
-                template_used="",
-                created_at=datetime.now()
+        except TemplateError as e:
+            logger.error(f"模板处理失败: {str(e)}")
+            raise
+        except Exception as e:
+            result = self._build_error_result(request, e)
+        
+        yield result
+    
+    def _lookup_cache(self, request: OptimizationRequest,
+                      cache_key: Optional[str]) -> Optional[OptimizationResult]:
+        """依次查询精确缓存和语义缓存"""
+        opt_type = request.optimization_type.value
+        
+        # 确定性请求优先查询缓存
+        if cache_key:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._stats["hits"] += 1
+                logger.info(f"命中优化结果缓存: {opt_type}")
+                return cached
+            self._stats["misses"] += 1
+        
+        # 精确缓存未命中时查询语义缓存
+        if self._semantic_cache:
+            cached = self._semantic_cache.lookup(
+                request.original_prompt,
+                namespace=self._semantic_namespace(request)
             )
+            if cached is not None:
+                self._stats["semantic_hits"] += 1
+                logger.info(f"命中语义缓存: {opt_type}")
+                return dataclasses.replace(cached, request=request)
+        
+        return None
+    
+    def _build_optimization_prompt(self, request: OptimizationRequest) -> str:
+        """记录请求并渲染优化提示词模板"""
+        # 记录API调用
+        api_logger.log_request(
+            provider=request.model_provider.value,
+            model=request.model_name,
+            prompt_length=len(request.original_prompt)
+        )
+        
+        # 创建模板上下文
+        context = create_template_context(
+            original_prompt=request.original_prompt,
+            custom_instructions=request.custom_instructions
+        )
+        
+        # 获取优化提示词模板
+        return self.template_manager.get_optimization_template(
+            optimization_type=request.optimization_type.value,
+            context=context
+        )
+    
+    def _build_result(self, request: OptimizationRequest, response: ModelResponse,
+                      cache_key: Optional[str], log_response: bool = True) -> OptimizationResult:
+        """处理模型响应并生成优化结果，成功结果写入缓存"""
+        opt_type = request.optimization_type.value
+        provider_value = request.model_provider.value
+        template_path = f"optimization/{opt_type}.md"
+        
+        # 记录API响应
+        if log_response:
+            api_logger.log_response(
+                provider=provider_value,
+                model=request.model_name,
+                success=response.success,
+                response_time=response.response_time,
+                tokens_used=response.tokens_used
+            )
+        
+        if not response.success:
+            raise ModelError(f"模型调用失败: {response.error}")
+        
+        # 处理优化结果
+        optimized_prompt = self._extract_optimized_prompt(response.content)
+        
+        suggestions, metrics = self._analyze_output(
+            request.original_prompt,
+            optimized_prompt,
+            request.optimization_type
+        )
+        
+        # 创建结果对象
+        result = OptimizationResult(
+            request=request,
+            optimized_prompt=optimized_prompt,
+            suggestions=suggestions,
+            response=response,
+            metrics=metrics,
+            template_used=template_path,
+            created_at_epoch=time.time()
+        )
+        
+        if cache_key:
+            self._cache.set(cache_key, result)
+        if self._semantic_cache:
+            self._semantic_cache.insert(
+                request.original_prompt,
+                result,
+                namespace=self._semantic_namespace(request)
+            )
+        
+        logger.info(f"提示词优化完成: {opt_type}")
+        return result
+    
+    def _build_error_result(self, request: OptimizationRequest, error: Exception) -> OptimizationResult:
+        """记录错误并返回失败结果"""
+        provider_value = request.model_provider.value
+        logger.error(f"提示词优化失败: {str(error)}")
+        
+        # 记录错误
+        api_logger.log_error(
+            provider=provider_value,
+            model=request.model_name,
+            error=str(error)
+        )
+        
+        # 返回失败结果
+        error_response = ModelResponse(
+            content="",
+            model=request.model_name,
+            provider=provider_value,
+            success=False,
+            response_time=0.0,
+            error=str(error)
+        )
+        
+        return OptimizationResult(
+            request=request,
+            optimized_prompt="",
+            suggestions=[],
+            response=error_response,
+            metrics={},
+            template_used="",
+            created_at_epoch=time.time()
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取优化结果缓存统计"""
+        return {**self._stats, **self._cache.stats()}
+    
+    def clear_cache(self):
+        """清空优化结果缓存"""
+        self._cache.clear()
+        if self._semantic_cache:
+            self._semantic_cache.clear()
+        self._stats = {"hits": 0, "misses": 0, "semantic_hits": 0}
     
     def evaluate_optimization(self, 
                             original_prompt: str,
@@ -226,20 +678,11 @@ class OptimizationService:
     
     def _detect_content_type(self, content: str) -> str:
         """检测内容类型"""
-        content_lower = content.lower()
-        
-        code_keywords = ["代码", "编程", "算法", "函数", "code", "programming"]
-        writing_keywords = ["写作", "文章", "文案", "创作", "writing", "article"]
-        analysis_keywords = ["分析", "数据", "研究", "评估", "analysis", "research"]
-        
-        if any(keyword in content_lower for keyword in code_keywords):
-            return "code"
-        elif any(keyword in content_lower for keyword in writing_keywords):
-            return "writing"
-        elif any(keyword in content_lower for keyword in analysis_keywords):
-            return "analysis"
-        else:
-            return "general"
+        # 按优先级依次匹配，保持代码 > 写作 > 分析的判定顺序
+        for content_type, pattern in _CONTENT_TYPE_PATTERNS:
+            if pattern.search(content):
+                return content_type
+        return "general"
     
     def get_available_optimization_types(self) -> List[Dict[str, Any]]:
         """获取可用的优化类型"""
@@ -272,122 +715,124 @@ class OptimizationService:
         if not self.template_manager.validate_template(template_path):
             raise TemplateError(f"优化模板不存在: {template_path}")
     
+    @staticmethod
+    def _semantic_namespace(request: OptimizationRequest) -> str:
+        """
+        语义缓存命名空间，按模型、优化类型、自定义指令和生成配置隔离
+        
+        语义缓存只按原始提示词的相似度匹配，自定义指令或生成配置不同的请求
+        结果不可互用，因此以二者的哈希区分；均为默认值时不附加哈希。
+        """
+        namespace = f"{request.model_provider.value}:{request.model_name}:{request.optimization_type.value}"
+        config = request.generation_config
+        if config == DEFAULT_GENERATION_CONFIG:
+            config = None
+        if not request.custom_instructions and config is None:
+            return namespace
+        
+        raw = json.dumps(
+            {"inst": request.custom_instructions, "cfg": config.to_dict() if config else None},
+            sort_keys=True, ensure_ascii=False
+        )
+        return f"{namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+    
+    def _make_cache_key(self, request: OptimizationRequest) -> Optional[str]:
+        """生成缓存键，仅temperature=0的确定性请求可缓存"""
+        config = request.generation_config
+        if config is None or config.temperature != 0:
+            return None
+        
+        payload = {
+            "m": request.model_name,
+            "p": request.model_provider.value,
+            "t": request.optimization_type.value,
+            "prompt": request.original_prompt,
+            "inst": request.custom_instructions,
+            # 覆盖全部生成参数，任一字段不同的请求都不会共用缓存
+            "cfg": config.to_dict()
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
     def _extract_optimized_prompt(self, response_content: str) -> str:
         """从响应中提取优化后的提示词"""
         content = response_content.strip()
         
-        # 查找常见的分隔符
-        separators = [
-            "优化后的提示词：",
-            "优化后：",
-            "Optimized prompt:",
-            "优化结果：",
-            "改进后：",
-            "---"
-        ]
+        # 单次扫描找出所有分隔符，按优先级取第一个出现的分隔符
+        best = None
+        for match in _SEPARATOR_PATTERN.finditer(content):
+            sep = match.group(1)
+            if best is None or _SEPARATOR_PRIORITY[sep] < _SEPARATOR_PRIORITY[best[0]]:
+                best = (sep, match.start())
+                if _SEPARATOR_PRIORITY[sep] == 0:
+                    break
         
-        for sep in separators:
-            if sep in content:
-                parts = content.split(sep, 1)
-                if len(parts) > 1:
-                    extracted = parts[1].strip()
-                    # 移除可能的代码块标记
-                    if extracted.startswith("```") and extracted.endswith("```"):
-                        lines = extracted.split('\n')
-                        if len(lines) > 2:
-                            extracted = '\n'.join(lines[1:-1])
-                    # 移除引号
-                    if extracted.startswith('"') and extracted.endswith('"'):
-                        extracted = extracted[1:-1]
-                    elif extracted.startswith("'") and extracted.endswith("'"):
-                        extracted = extracted[1:-1]
-                    return extracted
+        if best is not None:
+            sep, offset = best
+            extracted = content[offset + len(sep):].strip()
+            # 移除可能的代码块标记
+            if extracted.startswith("```") and extracted.endswith("```"):
+                lines = extracted.split('\n')
+                if len(lines) > 2:
+                    extracted = '\n'.join(lines[1:-1])
+            # 移除引号
+            if extracted.startswith('"') and extracted.endswith('"'):
+                extracted = extracted[1:-1]
+            elif extracted.startswith("'") and extracted.endswith("'"):
+                extracted = extracted[1:-1]
+            return extracted
         
         return content
     
+    def _analyze_output(self, original: str, optimized: str,
+                        optimization_type: OptimizationType) -> Tuple[List[str], Dict[str, float]]:
+        """单次扫描优化结果，同时得到优化建议和性能指标"""
+        metrics, hits = self._calculate_metrics(original, optimized, optimization_type)
+        suggestions = self._generate_suggestions(original, optimized, optimization_type, hits=hits)
+        return suggestions, metrics
+    
     def _generate_suggestions(self, original: str, optimized: str, 
-                             optimization_type: OptimizationType) -> List[str]:
-        """生成优化建议"""
-        suggestions = []
-        
-        # 基于优化类型的建议
-        type_suggestions = {
-            OptimizationType.GENERAL: [
-                "提升了整体表达的清晰度和准确性",
-                "增加了必要的上下文信息"
-            ],
-            OptimizationType.STRUCTURED: [
-                "采用了结构化的组织形式",
-                "明确了任务步骤和输出格式"
-            ],
-            OptimizationType.ROLE_BASED: [
-                "引入了专业角色设定",
-                "强化了专业背景和能力描述"
-            ],
-            OptimizationType.TASK_ORIENTED: [
-                "明确了任务目标和期望结果",
-                "增加了具体的执行指导"
-            ],
-            OptimizationType.CREATIVE: [
-                "增强了创意性和想象力引导",
-                "鼓励多元化的思考角度"
-            ],
-            OptimizationType.LOGICAL: [
-                "强化了逻辑推理结构",
-                "增加了分析思考的指导"
-            ]
-        }
+                             optimization_type: OptimizationType,
+                             hits: Optional[set] = None) -> List[str]:
+        """生成优化建议，hits 为 _calculate_metrics 已扫描出的指标词集合"""
+        if hits is None:
+            hits = _scan_indicators(optimized)
         
-        suggestions.extend(type_suggestions.get(optimization_type, []))
-        
-        # 基于内容变化的建议
+        # 基于内容变化的扩展程度
         original_len = len(original)
         optimized_len = len(optimized)
-        
         if optimized_len > original_len * 1.5:
-            suggestions.append("显著扩展了提示词的详细程度")
+            expansion = 2
         elif optimized_len > original_len * 1.2:
-            suggestions.append("适度增加了指导信息")
-        
-        # 检查结构化元素
-        if "##" in optimized or "**" in optimized:
-            suggestions.append("使用了Markdown格式增强可读性")
-        
-        if "步骤" in optimized or "Step" in optimized:
-            suggestions.append("添加了步骤化的执行指导")
-        
-        if "例如" in optimized or "比如" in optimized:
-            suggestions.append("提供了具体的示例说明")
+            expansion = 1
+        else:
+            expansion = 0
         
-        return suggestions if suggestions else ["应用了基于模板的智能优化策略"]
+        return list(_suggestions_for(
+            optimization_type,
+            expansion,
+            "##" in hits or "**" in hits,
+            "步骤" in hits or "Step" in hits,
+            "例如" in hits or "比如" in hits
+        ))
     
     def _calculate_metrics(self, original: str, optimized: str, 
-                          optimization_type: OptimizationType) -> Dict[str, float]:
-        """计算优化指标"""
+                          optimization_type: OptimizationType) -> Tuple[Dict[str, float], set]:
+        """计算优化指标，同时返回命中的指标词集合"""
         metrics = {}
         
         # 长度变化比例
         length_ratio = len(optimized) / max(len(original), 1)
         metrics["length_improvement"] = (length_ratio - 1) * 100
         
-        # 结构化程度
-        structure_score = 0
-        structure_indicators = ["##", "**", "1.", "2.", "-", "步骤", "要求"]
-        for indicator in structure_indicators:
-            if indicator in optimized:
-                structure_score += 1
-        
-        metrics["structure_score"] = min(structure_score / len(structure_indicators) * 10, 10)
-        
-        # 详细程度
-        detail_indicators = ["具体", "详细", "例如", "比如", "包括", "需要", "应该"]
-        detail_score = sum(1 for indicator in detail_indicators if indicator in optimized)
-        metrics["detail_score"] = min(detail_score / len(detail_indicators) * 10, 10)
+        # 单次扫描得到命中的指标词集合
+        hits = _scan_indicators(optimized)
         
-        # 专业性
-        professional_indicators = ["专业", "专家", "分析", "评估", "考虑", "建议"]
-        professional_score = sum(1 for indicator in professional_indicators if indicator in optimized)
-        metrics["professional_score"] = min(professional_score / len(professional_indicators) * 10, 10)
+        # 结构化程度、详细程度、专业性
+        for category in ("structure", "detail", "professional"):
+            indicators = _METRIC_INDICATORS[category]
+            score = len(hits.intersection(indicators))
+            metrics[f"{category}_score"] = min(score / len(indicators) * 10, 10)
         
         # 综合改进分数
         metrics["overall_improvement"] = (
@@ -396,7 +841,7 @@ class OptimizationService:
             metrics["professional_score"] * 0.4
         )
         
-        return metrics
+        return metrics, hits
 
 
 # 导出服务类
@@ -0,0 +1,155 @@
+"""
+语义缓存 - 基于本地向量模型的近似结果缓存
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# 尝试导入可选依赖
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SemanticCache:
+    """语义缓存：按余弦相似度复用语义相近请求的结果，支持TTL与LRU淘汰"""
+
+    def __init__(self,
+                 model: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 threshold: float = 0.9,
+                 ttl: Optional[float] = 3600,
+                 max_entries: int = 1000,
+                 encoder: Optional[Callable[[str], Sequence[float]]] = None):
+        """
+        初始化语义缓存
+
+        Args:
+            model: sentence-transformers 向量模型名称，提供encoder时仅用于日志
+            threshold: 命中所需的最小余弦相似度
+            ttl: 条目存活秒数，None表示不过期
+            max_entries: 每个命名空间的最大条目数，超出时淘汰最久未命中的条目
+            encoder: 自定义向量函数（如调用Ollama的embedding接口），提供时不加载本地模型
+        """
+        if encoder is None and not SEMANTIC_CACHE_AVAILABLE:
+            raise ImportError("sentence-transformers 包未安装，请运行: pip install sentence-transformers")
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy 包未安装，请运行: pip install numpy")
+
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._encoder = SentenceTransformer(model) if encoder is None else None
+        self._encode_fn = encoder
+        # 每个命名空间一个 (N, dim) 的归一化向量矩阵，与条目列表一一对应
+        # 条目为 [写入时间, 最近访问时间, 缓存值]
+        self._vectors: Dict[str, "np.ndarray"] = {}
+        self._entries: Dict[str, List[list]] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"语义缓存初始化完成: {model}, 阈值: {threshold}, 容量: {max_entries}")
+
+    def _encode(self, text: str) -> "np.ndarray":
+        """编码为L2归一化向量，内积即余弦相似度"""
+        if self._encode_fn is None:
+            vector = self._encoder.encode([text], normalize_embeddings=True)[0]
+            return np.asarray(vector, dtype=np.float32)
+
+        vector = np.asarray(self._encode_fn(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at >= self.ttl
+
+    def lookup(self, text: str, namespace: str = "") -> Optional[Any]:
+        """
+        查找语义相近的缓存结果
+
+        Args:
+            text: 查询文本
+            namespace: 命名空间，不同命名空间互不命中
+
+        Returns:
+            命中的缓存值，未命中返回None
+        """
+        with self._lock:
+            if namespace not in self._vectors:
+                return None
+
+        query = self._encode(text)
+
+        with self._lock:
+            vectors = self._vectors.get(namespace)
+            if vectors is None or not len(vectors):
+                return None
+
+            scores = vectors @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            entry = self._entries[namespace][best]
+            now = time.monotonic()
+            if self._is_expired(entry[0], now):
+                return None
+
+            entry[1] = now
+            return entry[2]
+
+    def insert(self, text: str, value: Any, namespace: str = ""):
+        """
+        写入缓存
+
+        Args:
+            text: 条目文本
+            value: 缓存值
+            namespace: 命名空间
+        """
+        vector = self._encode(text)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._entries.get(namespace, [])
+            vectors = self._vectors.get(namespace)
+
+            # 顺带清理过期条目，容量已满时再淘汰最久未访问的条目
+            keep = [i for i, entry in enumerate(entries)
+                    if not self._is_expired(entry[0], now)]
+            if len(keep) >= self.max_entries:
+                keep.sort(key=lambda i: entries[i][1])
+                keep = sorted(keep[len(keep) - self.max_entries + 1:])
+            if len(keep) != len(entries):
+                entries = [entries[i] for i in keep]
+                vectors = vectors[keep]
+
+            entries.append([now, now, value])
+            vectors = vector[None, :] if vectors is None or not len(vectors) else np.vstack([vectors, vector])
+
+            self._entries[namespace] = entries
+            self._vectors[namespace] = vectors
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._vectors.clear()
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+
+# 导出主要类
+__all__ = ["SemanticCache", "SEMANTIC_CACHE_AVAILABLE", "NUMPY_AVAILABLE"]
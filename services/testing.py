@@ -1,17 +1,96 @@
-import time
+import asyncio
 import random
-from typing import Dict, Any
+import zlib
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from utils.config import FAST_MODE
+
+# 模拟质量分数的抽样区间：基础分、相关性偏移、完整性偏移
+_SCORE_LOW = np.array([7.0, -0.5, -0.3])
+_SCORE_HIGH = np.array([9.5, 0.5, 0.7])
+
+# 专家风格回答模板，仅含一个 {content} 占位符
+_EXPERT_TEMPLATE = """**专业分析:**
+基于我在相关领域的经验，{content}涉及以下几个核心要点：
+
+1. **理论基础**: 从理论角度来看，这个问题需要考虑...
+2. **实践应用**: 在实际应用中，我们通常采用...
+3. **最佳实践**: 根据行业标准和最佳实践...
+4. **注意事项**: 需要特别注意的是...
+
+**总结建议:**
+综合以上分析，我建议采取以下措施..."""
+
+# 结构化回答模板，仅含一个 {content} 占位符
+_STRUCTURED_RESP_TEMPLATE = """## 概述
+{content}是一个需要系统性分析的问题。
+
+## 详细分析
+### 主要方面
+- 方面一：相关的基础概念和定义
+- 方面二：实际应用和操作方法
+- 方面三：可能遇到的挑战和解决方案
+
+### 具体建议
+1. 首先，需要明确目标和需求
+2. 其次，制定详细的实施计划
+3. 最后，建立监控和评估机制
+
+## 示例说明
+以实际案例为例，展示如何应用相关方法...
+
+## 关键要点
+- 要点一：注重系统性思考
+- 要点二：关注实践可行性
+- 要点三：建立反馈机制"""
 
 class TestService:
     """提示词测试服务"""
     
-    def __init__(self):
-        pass
+    def __init__(self, seed: Optional[int] = None):
+        """
+        初始化测试服务
+        
+        Args:
+            seed: 随机种子，固定后模拟结果可复现
+        """
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
     
     def compare_prompts(self, original_prompt: str, optimized_prompt: str, 
                        test_content: str, model: str) -> Dict[str, Any]:
         """
-        对比两个提示词的效果
+        对比两个提示词的效果（同步入口）
+        
+        Args:
+            original_prompt: 原始提示词
+            optimized_prompt: 优化后的提示词
+            test_content: 测试内容
+            model: 使用的模型
+            
+        Returns:
+            对比测试结果
+            
+        Raises:
+            RuntimeError: 在运行中的事件循环内调用时，应改用 compare_prompts_async
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("compare_prompts 不能在运行中的事件循环内调用，请使用 await compare_prompts_async(...)")
+        
+        return asyncio.run(
+            self.compare_prompts_async(original_prompt, optimized_prompt, test_content, model)
+        )
+    
+    async def compare_prompts_async(self, original_prompt: str, optimized_prompt: str,
+                                    test_content: str, model: str) -> Dict[str, Any]:
+        """
+        对比两个提示词的效果，两次模型调用并发执行
         
         Args:
             original_prompt: 原始提示词
@@ -23,8 +102,10 @@ class TestService:
             对比测试结果
         """
         # 模拟API调用
-        original_result = self._simulate_model_response(original_prompt, test_content, model)
-        optimized_result = self._simulate_model_response(optimized_prompt, test_content, model)
+        original_result, optimized_result = await asyncio.gather(
+            self._simulate_model_response(original_prompt, test_content, model),
+            self._simulate_model_response(optimized_prompt, test_content, model)
+        )
         
         # 计算性能指标
         metrics = self._calculate_metrics(original_result, optimized_result)
@@ -36,11 +117,12 @@ class TestService:
             "model_used": model
         }
     
-    def _simulate_model_response(self, prompt: str, content: str, model: str) -> Dict[str, Any]:
+    async def _simulate_model_response(self, prompt: str, content: str, model: str) -> Dict[str, Any]:
         """模拟模型响应"""
         # 模拟不同的响应时间
-        response_time = random.uniform(0.5, 3.0)
-        time.sleep(min(response_time, 1.0))  # 实际演示中缩短等待时间
+        response_time = self._rng.uniform(0.5, 3.0)
+        if not FAST_MODE:
+            await asyncio.sleep(min(response_time, 1.0))  # 实际演示中缩短等待时间
         
         # 模拟响应内容生成
         if "专家" in prompt or "专业" in prompt:
@@ -53,56 +135,24 @@ class TestService:
             response_content = f"关于'{content}'的回答：\n\n"
             response_content += self._generate_basic_response(content)
         
-        # 计算质量分数（模拟）
-        quality_score = self._calculate_quality_score(prompt, content, response_content)
+        # 计算质量分数（模拟），回答长度只计算一次
+        rlen = len(response_content)
+        quality_score = self._calculate_quality_score(prompt, content, response_content, rlen=rlen)
         
         return {
             "content": response_content,
             "response_time": response_time,
             "quality_score": quality_score,
-            "word_count": len(response_content)
+            "word_count": rlen
         }
     
     def _generate_expert_response(self, content: str) -> str:
         """生成专家风格的回答"""
-        return f"""
-**专业分析:**
-基于我在相关领域的经验，{content}涉及以下几个核心要点：
-
-1. **理论基础**: 从理论角度来看，这个问题需要考虑...
-2. **实践应用**: 在实际应用中，我们通常采用...
-3. **最佳实践**: 根据行业标准和最佳实践...
-4. **注意事项**: 需要特别注意的是...
-
-**总结建议:**
-综合以上分析，我建议采取以下措施...
-        """.strip()
+        return _EXPERT_TEMPLATE.format(content=content)
     
     def _generate_structured_response(self, content: str) -> str:
         """生成结构化回答"""
-        return f"""
-## 概述
-{content}是一个需要系统性分析的问题。
-
-## 详细分析
-### 主要方面
-- 方面一：相关的基础概念和定义
-- 方面二：实际应用和操作方法
-- 方面三：可能遇到的挑战和解决方案
-
-### 具体建议
-1. 首先，需要明确目标和需求
-2. 其次，制定详细的实施计划
-3. 最后，建立监控和评估机制
-
-## 示例说明
-以实际案例为例，展示如何应用相关方法...
-
-## 关键要点
-- 要点一：注重系统性思考
-- 要点二：关注实践可行性
-- 要点三：建立反馈机制
-        """.strip()
+        return _STRUCTURED_RESP_TEMPLATE.format(content=content)
     
     def _generate_basic_response(self, content: str) -> str:
         """生成基础回答"""
@@ -111,24 +161,23 @@ class TestService:
             f"关于{content}，这涉及多个方面的考虑。让我为您详细解释一下...",
             f"您提出的{content}问题很有价值。从经验来看，通常可以通过以下方式来处理..."
         ]
-        return random.choice(responses)
+        # 按内容哈希选择回答，相同内容结果稳定（crc32 跨进程一致，不受哈希随机化影响）
+        return responses[zlib.crc32(content.encode("utf-8")) % len(responses)]
     
-    def _calculate_quality_score(self, prompt: str, content: str, response: str) -> Dict[str, float]:
-        """计算回答质量分数（模拟）"""
-        base_score = random.uniform(7.0, 9.5)
+    def _calculate_quality_score(self, prompt: str, content: str, response: str,
+                                 rlen: Optional[int] = None) -> Dict[str, float]:
+        """计算回答质量分数（模拟），rlen 为预先计算的回答长度"""
+        if rlen is None:
+            rlen = len(response)
         
-        # 根据提示词特征调整分数
-        if "专家" in prompt:
-            base_score += 0.5
-        if "步骤" in prompt or "格式" in prompt:
-            base_score += 0.3
-        if len(response) > 200:
-            base_score += 0.2
+        # 一次抽取基础分及两个维度的偏移
+        base_score, relevance_offset, completeness_offset = self._np_rng.uniform(_SCORE_LOW, _SCORE_HIGH).tolist()
+        base_score += _quality_adjustment(prompt, rlen)
         
         return {
             "accuracy": min(base_score, 10.0),
-            "relevance": min(base_score + random.uniform(-0.5, 0.5), 10.0),
-            "completeness": min(base_score + random.uniform(-0.3, 0.7), 10.0)
+            "relevance": min(base_score + relevance_offset, 10.0),
+            "completeness": min(base_score + completeness_offset, 10.0)
         }
     
     def _calculate_metrics(self, original_result: Dict, optimized_result: Dict) -> Dict[str, float]:
@@ -152,4 +201,17 @@ class TestService:
             "original_completeness": original_quality["completeness"],
             "optimized_completeness": optimized_quality["completeness"],
             "completeness_improvement": optimized_quality["completeness"] - original_quality["completeness"]
-        }
\ No newline at end of file
+        }
+
+
+def _quality_adjustment(prompt: str, rlen: int) -> float:
+    """根据提示词和回答长度计算基础分的调整量"""
+    adjustment = 0.0
+    if "专家" in prompt:
+        adjustment += 0.5
+    if "步骤" in prompt or "格式" in prompt:
+        adjustment += 0.3
+    if rlen > 200:
+        adjustment += 0.2
+    return adjustment
+
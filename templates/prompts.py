@@ -1,5 +1,7 @@
 """提示词模板管理"""
 
+from types import MappingProxyType
+
 # 通用优化模板
 GENERAL_OPTIMIZATION_TEMPLATE = """
 你是一个专业的提示词优化专家。请对以下提示词进行优化，使其更加清晰、有效和易于理解。
@@ -128,27 +130,31 @@ TEST_EVALUATION_TEMPLATE = """
 提供详细的对比分析。
 """
 
+# 策略到优化模板的映射，模块导入时构建一次
+OPTIMIZATION_TEMPLATES = {
+    "general": GENERAL_OPTIMIZATION_TEMPLATE,
+    "structured": STRUCTURED_OPTIMIZATION_TEMPLATE,
+    "role_based": ROLE_BASED_OPTIMIZATION_TEMPLATE,
+    "task_oriented": TASK_ORIENTED_OPTIMIZATION_TEMPLATE,
+    "creative": CREATIVE_OPTIMIZATION_TEMPLATE,
+    "logical": LOGICAL_OPTIMIZATION_TEMPLATE,
+}
+
 # 获取优化模板的函数
 def get_optimization_template(strategy: str) -> str:
     """根据策略获取对应的优化模板"""
-    templates = {
-        "general": GENERAL_OPTIMIZATION_TEMPLATE,
-        "structured": STRUCTURED_OPTIMIZATION_TEMPLATE,
-        "role_based": ROLE_BASED_OPTIMIZATION_TEMPLATE,
-        "task_oriented": TASK_ORIENTED_OPTIMIZATION_TEMPLATE,
-        "creative": CREATIVE_OPTIMIZATION_TEMPLATE,
-        "logical": LOGICAL_OPTIMIZATION_TEMPLATE,
-    }
-    return templates.get(strategy, GENERAL_OPTIMIZATION_TEMPLATE)
-
-# 模板配置
-TEMPLATE_CONFIG = {
-    "strategies": [
-        {"name": "🔧 通用优化", "key": "general", "description": "适用于大多数场景的通用优化"},
-        {"name": "📋 结构化优化", "key": "structured", "description": "增加明确的结构和格式要求"},
-        {"name": "🎭 角色导向优化", "key": "role_based", "description": "基于特定角色或身份进行优化"},
-        {"name": "🎯 任务导向优化", "key": "task_oriented", "description": "针对特定任务目标进行优化"},
-        {"name": "💡 创意优化", "key": "creative", "description": "提升创意性和想象力的优化"},
-        {"name": "🧠 逻辑优化", "key": "logical", "description": "增强逻辑推理和分析能力"},
-    ]
-}
\ No newline at end of file
+    return OPTIMIZATION_TEMPLATES.get(strategy, GENERAL_OPTIMIZATION_TEMPLATE)
+
+# 模板配置（只读：策略列表为元组，各项为只读映射）
+_STRATEGY_TUPLE = tuple(MappingProxyType(item) for item in (
+    {"name": "🔧 通用优化", "key": "general", "description": "适用于大多数场景的通用优化"},
+    {"name": "📋 结构化优化", "key": "structured", "description": "增加明确的结构和格式要求"},
+    {"name": "🎭 角色导向优化", "key": "role_based", "description": "基于特定角色或身份进行优化"},
+    {"name": "🎯 任务导向优化", "key": "task_oriented", "description": "针对特定任务目标进行优化"},
+    {"name": "💡 创意优化", "key": "creative", "description": "提升创意性和想象力的优化"},
+    {"name": "🧠 逻辑优化", "key": "logical", "description": "增强逻辑推理和分析能力"},
+))
+
+TEMPLATE_CONFIG = MappingProxyType({
+    "strategies": _STRATEGY_TUPLE
+})
@@ -3,19 +3,40 @@
 """
 
 import os
+import threading
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from jinja2 import Environment, FileSystemLoader, Template
-from dataclasses import dataclass, asdict
+from collections import ChainMap
+from functools import lru_cache
 
+from config.settings import AppConfig
 from utils.logger import get_logger
 from utils.exceptions import TemplateError
+from utils.compat import slotted_dataclass
 
 logger = get_logger(__name__)
 
+# 优先使用libyaml的C加载器
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+
+@lru_cache(maxsize=32)
+def _load_yaml(path: str, mtime: float) -> Any:
+    """按 (路径, 修改时间) 缓存YAML解析结果，文件未修改时直接复用"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+class _SafeDict(dict):
+    """format_map 用的字典，缺失的键原样保留为 {key}"""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+@slotted_dataclass(frozen=True)
 class TemplateContext:
     """模板上下文数据类"""
     original_prompt: Optional[str] = None
@@ -27,7 +48,14 @@ class TemplateContext:
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
-        result = asdict(self)
+        result = {
+            "original_prompt": self.original_prompt,
+            "optimized_prompt": self.optimized_prompt,
+            "test_content": self.test_content,
+            "custom_instructions": self.custom_instructions,
+            "optimization_type": self.optimization_type,
+            "additional_vars": self.additional_vars
+        }
         if self.additional_vars:
             result.update(self.additional_vars)
         return result
@@ -47,14 +75,19 @@ class TemplateManager:
         self.config_path = self.templates_dir / "config" / "template_config.yaml"
         self.variables_path = self.templates_dir / "config" / "variables.yaml"
         
-        # 初始化Jinja2环境
+        # 初始化Jinja2环境，非调试模式下不再逐次检查模板文件是否修改
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
             trim_blocks=True,
             lstrip_blocks=True,
-            keep_trailing_newline=True
+            keep_trailing_newline=True,
+            auto_reload=AppConfig.DEBUG,
+            cache_size=400
         )
         
+        # 已验证通过的模板路径，仅缓存有效结果
+        self._validated_templates = set()
+        
         # 加载配置
         self.config = self._load_config()
         self.global_variables = self._load_global_variables()
@@ -68,10 +101,9 @@ class TemplateManager:
                 logger.warning(f"配置文件不存在: {self.config_path}")
                 return {}
             
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                logger.info("模板配置加载成功")
-                return config
+            config = _load_yaml(str(self.config_path), self.config_path.stat().st_mtime)
+            logger.info("模板配置加载成功")
+            return config
         except Exception as e:
             logger.error(f"加载模板配置失败: {e}")
             return {}
@@ -83,10 +115,9 @@ class TemplateManager:
                 logger.info("全局变量文件不存在，使用默认配置")
                 return {}
             
-            with open(self.variables_path, 'r', encoding='utf-8') as f:
-                variables = yaml.safe_load(f)
-                logger.info("全局变量加载成功")
-                return variables
+            variables = _load_yaml(str(self.variables_path), self.variables_path.stat().st_mtime)
+            logger.info("全局变量加载成功")
+            return variables
         except Exception as e:
             logger.error(f"加载全局变量失败: {e}")
             return {}
@@ -232,14 +263,8 @@ class TemplateManager:
             # 获取模板内容
             template_content = get_optimization_template(template_key)
             
-            # 简单的变量替换
-            rendered = template_content
-            for key, value in variables.items():
-                placeholder = "{" + key + "}"
-                if placeholder in rendered:
-                    rendered = rendered.replace(placeholder, str(value))
-            
-            return rendered
+            # 单次替换所有占位符，未提供的变量保留原样
+            return template_content.format_map(_SafeDict(variables))
             
         except Exception as e:
             logger.error(f"Python模板渲染失败: {template_key} - {e}")
@@ -261,19 +286,12 @@ class TemplateManager:
             合并后的变量字典
         """
         # 按优先级合并：additional_vars > context > default_vars > global_variables
-        merged = {}
-        
-        # 1. 全局变量（最低优先级）
-        merged.update(self.global_variables)
-        
-        # 2. 默认变量
-        merged.update(default_vars)
-        
-        # 3. 上下文变量
-        merged.update(context.to_dict())
-        
-        # 4. 额外变量（最高优先级）
-        merged.update(additional_vars)
+        merged = ChainMap(
+            additional_vars,
+            context.to_dict(),
+            default_vars,
+            self.global_variables or {}
+        )
         
         # 过滤None值
         return {k: v for k, v in merged.items() if v is not None}
@@ -311,6 +329,9 @@ class TemplateManager:
         Returns:
             是否有效
         """
+        if template_path in self._validated_templates:
+            return True
+        
         try:
             full_path = self.templates_dir / template_path
             if not full_path.exists():
@@ -319,6 +340,7 @@ class TemplateManager:
             
             # 尝试加载模板
             self.env.get_template(template_path)
+            self._validated_templates.add(template_path)
             return True
             
         except Exception as e:
@@ -360,6 +382,10 @@ class TemplateManager:
         logger.info("重新加载模板配置")
         self.config = self._load_config()
         self.global_variables = self._load_global_variables()
+        self._validated_templates.clear()
+        # 清空已编译的Jinja2模板，下次渲染时重新加载
+        if self.env.cache is not None:
+            self.env.cache.clear()
 
 
 # 便捷函数
@@ -378,8 +404,26 @@ def create_template_context(original_prompt: str = None,
     )
 
 
-# 全局模板管理器实例
-template_manager = TemplateManager()
+# 全局模板管理器实例，首次访问时创建
+_template_manager: Optional[TemplateManager] = None
+_template_manager_lock = threading.Lock()
+
+
+def get_template_manager() -> TemplateManager:
+    """获取全局模板管理器，首次调用时才加载配置"""
+    global _template_manager
+    if _template_manager is None:
+        with _template_manager_lock:
+            if _template_manager is None:
+                _template_manager = TemplateManager()
+    return _template_manager
+
+
+def __getattr__(name: str) -> Any:
+    """兼容 `from templates.template_manager import template_manager` 的延迟访问"""
+    if name == "template_manager":
+        return get_template_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # 导出主要类和函数
@@ -387,5 +431,6 @@ __all__ = [
     "TemplateManager",
     "TemplateContext", 
     "create_template_context",
+    "get_template_manager",
     "template_manager"
 ]
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+缓存工具模块
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """线程安全的LRU缓存，可选TTL过期"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大条目数
+            ttl: 条目存活秒数，None表示不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，未命中或已过期时返回default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除并返回缓存值"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry is not None else default
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl}
+
+
+_MISSING = object()
+
+
+# 导出主要类
+__all__ = ["LRUCache"]
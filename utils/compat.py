@@ -0,0 +1,31 @@
+"""
+Python 版本兼容工具模块
+"""
+
+import sys
+from dataclasses import dataclass, fields
+
+
+def slotted_dataclass(cls=None, **kwargs):
+    """
+    带 __slots__ 的 dataclass 装饰器
+    
+    Python 3.10+ 直接使用 dataclass(slots=True)；旧版本先生成普通 dataclass，
+    再去掉类属性上的字段默认值（默认值已保存在生成的 __init__ 中）并以手动声明的
+    __slots__ 重建类。
+    """
+    def wrap(cls):
+        if sys.version_info >= (3, 10):
+            return dataclass(cls, slots=True, **kwargs)
+        
+        cls = dataclass(cls, **kwargs)
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(f.name for f in fields(cls))
+        cls_dict["__slots__"] = field_names
+        for name in field_names:
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    
+    return wrap if cls is None else wrap(cls)
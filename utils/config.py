@@ -2,26 +2,79 @@
 应用配置文件 - 使用环境变量管理敏感信息
 """
 
+import logging
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
-# 加载环境变量 - 从utils/.env加载
+# 环境变量文件 - 从utils/.env加载
 env_path = os.path.join(os.path.dirname(__file__), '.env')
-load_dotenv(env_path)
+
+
+@lru_cache(maxsize=1)
+def _env() -> Dict[str, str]:
+    """
+    解析 .env 并与进程环境变量合并，结果缓存，测试中可调用 _env.cache_clear() 重新加载
+    
+    已存在的进程环境变量优先于 .env 中的同名配置；DOTENV_DISABLE=1 时
+    （如容器内已直接注入环境变量）不导入 dotenv，也不读取 .env 文件
+    """
+    if os.getenv("DOTENV_DISABLE") == "1":
+        return dict(os.environ)
+    
+    from dotenv import dotenv_values
+    values = {k: v for k, v in dotenv_values(env_path).items() if v is not None}
+    values.update(os.environ)
+    return values
+
+
+def _getenv(key: str, default: Optional[str] = None) -> Optional[str]:
+    """从缓存的环境变量中读取配置"""
+    return _env().get(key, default)
+
+
+def _env_int(key: str, default: int) -> int:
+    """读取整数环境变量，未设置时直接返回数值默认值"""
+    value = _env().get(key)
+    return int(value) if value is not None else default
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    """读取布尔环境变量，仅 "true"（不区分大小写）视为真"""
+    value = _env().get(key)
+    return value.lower() == "true" if value is not None else default
+
+
+# 快速模式：跳过模拟调用中的等待，供开发调试和测试使用
+FAST_MODE = _getenv("PROMPT_OPT_FAST", "0") == "1"
+
+
+def _freeze(value: Any) -> Any:
+    """
+    递归冻结配置：字典转为只读映射，列表转为元组
+    
+    以下各模块级配置在运行期间只读，冻结后可避免被调用方意外修改
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 
 # 应用基础配置
-APP_CONFIG = {
+APP_CONFIG = _freeze({
     "app_title": "提示词优化器",
     "version": "1.0.0",
     "description": "AI提示词优化和测试工具 - 支持多种AI模型",
-    "debug_mode": os.getenv("DEBUG_MODE", "false").lower() == "true",
-    "log_level": os.getenv("LOG_LEVEL", "INFO"),
-    "max_concurrent_requests": int(os.getenv("MAX_CONCURRENT_REQUESTS", "5"))
-}
+    "debug_mode": _env_bool("DEBUG_MODE", False),
+    "log_level": _getenv("LOG_LEVEL", "INFO"),
+    "max_concurrent_requests": _env_int("MAX_CONCURRENT_REQUESTS", 5)
+})
 
 # 模型配置 - 统一管理所有支持的模型
-MODEL_CONFIG = {
+MODEL_CONFIG = _freeze({
     "ollama": {
         "display_name": "本地部署",
         "models": [
@@ -87,49 +140,49 @@ MODEL_CONFIG = {
             }
         ]
     }
-}
+})
 
 # API配置 - 从环境变量获取
-API_CONFIG = {
+API_CONFIG = _freeze({
     "ollama": {
-        "base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
-        "timeout": int(os.getenv("OLLAMA_TIMEOUT", "60")),
+        "base_url": _getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+        "timeout": _env_int("OLLAMA_TIMEOUT", 60),
         "api_key": None  # Ollama 不需要 API Key
     },
     "openai": {
-        "base_url": os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
-        "api_key": os.getenv("OPENAI_API_KEY"),
+        "base_url": _getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        "api_key": _getenv("OPENAI_API_KEY"),
         "timeout": 60
     },
     "anthropic": {
-        "base_url": os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com"),
-        "api_key": os.getenv("ANTHROPIC_API_KEY"),
+        "base_url": _getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com"),
+        "api_key": _getenv("ANTHROPIC_API_KEY"),
         "timeout": 60
     },
     "qwen": {
-        "base_url": os.getenv("QWEN_BASE_URL", "https://dashscope.aliyuncs.com/api/v1"),
-        "api_key": os.getenv("QWEN_API_KEY"),
+        "base_url": _getenv("QWEN_BASE_URL", "https://dashscope.aliyuncs.com/api/v1"),
+        "api_key": _getenv("QWEN_API_KEY"),
         "timeout": 60
     },
     "chatglm": {
-        "base_url": os.getenv("CHATGLM_BASE_URL", "https://open.bigmodel.cn/api/paas/v4"),
-        "api_key": os.getenv("CHATGLM_API_KEY"),
+        "base_url": _getenv("CHATGLM_BASE_URL", "https://open.bigmodel.cn/api/paas/v4"),
+        "api_key": _getenv("CHATGLM_API_KEY"),
         "timeout": 60
     },
     "deepseek": {
-        "base_url": os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com"),
-        "api_key": os.getenv("DEEPSEEK_API_KEY"),
+        "base_url": _getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com"),
+        "api_key": _getenv("DEEPSEEK_API_KEY"),
         "timeout": 60
     },
     "moonshot": {
-        "base_url": os.getenv("MOONSHOT_BASE_URL", "https://api.moonshot.cn/v1"),
-        "api_key": os.getenv("MOONSHOT_API_KEY"),
+        "base_url": _getenv("MOONSHOT_BASE_URL", "https://api.moonshot.cn/v1"),
+        "api_key": _getenv("MOONSHOT_API_KEY"),
         "timeout": 60
     }
-}
+})
 
 # 优化配置
-OPTIMIZATION_CONFIG = {
+OPTIMIZATION_CONFIG = _freeze({
     "optimization_types": [
         {
             "name": "通用优化",
@@ -166,10 +219,10 @@ OPTIMIZATION_CONFIG = {
     "timeout": 60,
     "use_real_models": True,
     "default_provider": "ollama"  # 默认使用的模型提供商
-}
+})
 
 # 测试配置
-TEST_CONFIG = {
+TEST_CONFIG = _freeze({
     "max_test_length": 5000,
     "comparison_metrics": [
         {
@@ -201,10 +254,10 @@ TEST_CONFIG = {
     "show_detailed_metrics": True,
     "show_token_usage": True,
     "enable_batch_testing": True
-}
+})
 
 # UI配置
-UI_CONFIG = {
+UI_CONFIG = _freeze({
     "theme": {
         "primary_color": "#FF6B6B",
         "background_color": "#F8F9FA",
@@ -224,79 +277,90 @@ UI_CONFIG = {
         "enable_dark_mode": True,
         "show_advanced_options": False
     }
-}
+})
 
 # 缓存配置
-CACHE_CONFIG = {
-    "enable_caching": os.getenv("ENABLE_CACHE", "true").lower() == "true",
-    "cache_ttl": int(os.getenv("CACHE_TTL", "3600")),
+CACHE_CONFIG = _freeze({
+    "enable_caching": _env_bool("ENABLE_CACHE", True),
+    "cache_ttl": _env_int("CACHE_TTL", 3600),
     "max_cache_size": 100,
-    "redis_url": os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    "redis_url": _getenv("REDIS_URL", "redis://localhost:6379/0"),
     "cache_prefix": "prompt_optimizer:"
-}
+})
 
 # 日志配置
-LOGGING_CONFIG = {
-    "level": os.getenv("LOG_LEVEL", "INFO"),
-    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+_LOG_LEVEL = _getenv("LOG_LEVEL", "INFO")
+_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+_LOG_LEVEL_INT = logging.getLevelName(_LOG_LEVEL.upper())
+
+LOGGING_CONFIG = _freeze({
+    "level": _LOG_LEVEL,
+    "format": _LOG_FORMAT,
     "file_path": "logs/app.log",
     "log_api_calls": True,
     "log_user_actions": True,
     "max_log_size": "10MB",
-    "backup_count": 5
-}
+    "backup_count": 5,
+    # 预先构建的格式化器和数值日志级别，供配置日志处理器时直接复用
+    "_formatter": logging.Formatter(_LOG_FORMAT),
+    "_level_int": _LOG_LEVEL_INT if isinstance(_LOG_LEVEL_INT, int) else logging.INFO
+})
 
 # 错误处理配置
-ERROR_CONFIG = {
+ERROR_CONFIG = _freeze({
     "max_retries": 3,
     "retry_delay": 1,
     "show_error_details": APP_CONFIG["debug_mode"],
     "fallback_to_simulation": False,
     "error_notification": True
-}
+})
 
 # 数据库配置 (如果需要)
-DATABASE_CONFIG = {
-    "url": os.getenv("DATABASE_URL", "sqlite:///app.db"),
+DATABASE_CONFIG = _freeze({
+    "url": _getenv("DATABASE_URL", "sqlite:///app.db"),
     "echo": APP_CONFIG["debug_mode"],
     "pool_size": 10,
     "max_overflow": 20
-}
+})
+
+# (提供商, 模型名) -> 模型配置 的索引，导入时构建一次
+_MODEL_INDEX = MappingProxyType({
+    (provider, model["name"]): model
+    for provider, config in MODEL_CONFIG.items()
+    for model in config["models"]
+})
 
 def get_model_config(provider: str, model_name: str) -> Optional[Dict[str, Any]]:
     """获取指定模型的配置"""
-    if provider not in MODEL_CONFIG:
-        return None
-    
-    for model in MODEL_CONFIG[provider]["models"]:
-        if model["name"] == model_name:
-            return model
-    
-    return None
+    return _MODEL_INDEX.get((provider, model_name))
 
 def get_api_config(provider: str) -> Optional[Dict[str, Any]]:
-    """获取指定提供商的API配置"""
+    """获取指定提供商的API配置（单次字典查找）"""
     return API_CONFIG.get(provider)
 
+@lru_cache(maxsize=1)
+def _available_providers() -> tuple:
+    """计算可用的模型提供商，API配置在运行期间不变，结果缓存"""
+    # Ollama 只需要 base_url，其他提供商需要 API Key
+    return tuple(
+        provider for provider, config in API_CONFIG.items()
+        if config.get("base_url" if provider == "ollama" else "api_key")
+    )
+
 def get_available_providers() -> list:
     """获取可用的模型提供商列表"""
-    available = []
-    
-    for provider, config in API_CONFIG.items():
-        # 检查必要的配置是否存在
-        if provider == "ollama":
-            # Ollama 只需要 base_url
-            if config.get("base_url"):
-                available.append(provider)
-        else:
-            # 其他提供商需要 API Key
-            if config.get("api_key"):
-                available.append(provider)
-    
-    return available
+    return list(_available_providers())
 
+get_available_providers.cache_clear = _available_providers.cache_clear
+
+@lru_cache(maxsize=1)
 def validate_config() -> Dict[str, Any]:
-    """验证配置完整性"""
+    """
+    验证配置完整性
+    
+    结果在首次调用（模块导入时）后缓存，返回的字典为共享对象，调用方不应修改；
+    修改环境后可依次调用 get_available_providers.cache_clear() 与 validate_config.cache_clear() 重新验证
+    """
     issues = []
     warnings = []
     
@@ -325,14 +389,12 @@ def validate_config() -> Dict[str, Any]:
         "available_providers": available_providers
     }
 
-# 在模块加载时验证配置
+# 在模块加载时验证配置，结果通过日志输出，不直接写标准输出
 _config_validation = validate_config()
+_logger = logging.getLogger(__name__)
 if not _config_validation["valid"]:
-    print("⚠️ 配置验证失败:")
-    for issue in _config_validation["issues"]:
-        print(f"  - {issue}")
-
-if _config_validation["warnings"]:
-    print("⚠️ 配置警告:")
-    for warning in _config_validation["warnings"]:
-        print(f"  - {warning}")
\ No newline at end of file
+    _logger.warning("配置验证失败: %s", "; ".join(_config_validation["issues"]))
+
+# 配置警告仅在调试模式下输出
+if _config_validation["warnings"] and APP_CONFIG["debug_mode"]:
+    _logger.warning("配置警告: %s", "; ".join(_config_validation["warnings"]))
\ No newline at end of file
@@ -4,40 +4,40 @@
 
 class PromptOptimizerError(Exception):
     """提示词优化器基础异常"""
-    pass
+    __slots__ = ()
 
 class ConfigurationError(PromptOptimizerError):
     """配置错误"""
-    pass
+    __slots__ = ()
 
 class ModelError(PromptOptimizerError):
     """模型相关错误"""
-    pass
+    __slots__ = ()
 
-class ConnectionError(PromptOptimizerError):
-    """连接错误"""
-    pass
+class PromptConnectionError(PromptOptimizerError, ConnectionError):
+    """连接错误，同时是内置 ConnectionError 的子类"""
+    __slots__ = ()
 
 class ValidationError(PromptOptimizerError):
     """验证错误"""
-    pass
+    __slots__ = ()
 
-class TimeoutError(PromptOptimizerError):
-    """超时错误"""
-    pass
+class PromptTimeoutError(PromptOptimizerError, TimeoutError):
+    """超时错误，同时是内置 TimeoutError 的子类"""
+    __slots__ = ()
 
 class RateLimitError(PromptOptimizerError):
     """限流错误"""
-    pass
+    __slots__ = ()
 
 class AuthenticationError(PromptOptimizerError):
     """认证错误"""
-    pass
+    __slots__ = ()
 
 class ResourceNotFoundError(PromptOptimizerError):
     """资源未找到错误"""
-    pass
+    __slots__ = ()
 
 class TemplateError(PromptOptimizerError):
     """模板相关错误"""
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
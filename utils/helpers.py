@@ -2,13 +2,62 @@
 辅助函数模块
 """
 
-import streamlit as st
+import os
 import re
+import string
+import time
+from collections import deque
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+# streamlit 导入较慢，默认在首次使用时才加载；EAGER_IMPORT=1 时在模块导入时加载
+if os.getenv("EAGER_IMPORT") == "1":
+    import streamlit as st
+
+
+def __getattr__(name: str) -> Any:
+    """兼容 `helpers.st` 的延迟访问"""
+    if name == "st":
+        import streamlit
+        globals()["st"] = streamlit
+        return streamlit
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# 敏感内容检测：固定关键词（已 casefold）直接做子串查找，仅通配的 personal...info 使用正则
+_SENSITIVE_KEYWORDS = ("密码", "password", "个人信息")
+_PERSONAL_INFO_RE = re.compile(r'personal.*info')
+
+# 时间戳格式
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 导出文本使用的换行符
+_NL = "\n"
+
+# 导出文本模板，导入时解析一次
+_EXPORT_TMPL = string.Template(
+    "提示词优化结果导出\n"
+    "==================\n\n"
+    "导出时间: $ts\n\n"
+    "原始提示词:\n$orig\n\n"
+    "优化后提示词:\n$opt\n\n"
+    "优化类型: $type\n"
+    "使用模型: $model\n\n"
+    "优化建议:\n$sugg\n\n"
+    "测试结果:\n$test"
+)
+
+# 文件大小单位
+_SIZE_UNITS = ("B", "KB", "MB", "GB")
+
+# 优化历史记录上限
+_MAX_HISTORY = 50
+
+
 def init_session_state():
     """初始化Streamlit会话状态"""
+    import streamlit as st
+    
     if "optimized_prompt" not in st.session_state:
         st.session_state.optimized_prompt = ""
     
@@ -19,7 +68,8 @@ def init_session_state():
         st.session_state.test_results = {}
     
     if "optimization_history" not in st.session_state:
-        st.session_state.optimization_history = []
+        # 定长队列，超出上限时自动丢弃最早的记录
+        st.session_state.optimization_history = deque(maxlen=_MAX_HISTORY)
 
 def validate_prompt(prompt: str, max_length: int = 10000) -> Dict[str, Any]:
     """
@@ -38,7 +88,7 @@ def validate_prompt(prompt: str, max_length: int = 10000) -> Dict[str, Any]:
         "warnings": []
     }
     
-    if not prompt or not prompt.strip():
+    if not prompt or prompt.isspace():
         result["valid"] = False
         result["errors"].append("提示词不能为空")
         return result
@@ -48,29 +98,26 @@ def validate_prompt(prompt: str, max_length: int = 10000) -> Dict[str, Any]:
         result["errors"].append(f"提示词长度不能超过{max_length}个字符")
     
     # 检查是否包含敏感内容（简单示例）
-    sensitive_patterns = [
-        r'密码|password',
-        r'个人信息|personal.*info',
-    ]
-    
-    for pattern in sensitive_patterns:
-        if re.search(pattern, prompt, re.IGNORECASE):
-            result["warnings"].append("检测到可能的敏感信息，请谨慎使用")
-            break
+    folded = prompt.casefold()
+    if any(keyword in folded for keyword in _SENSITIVE_KEYWORDS) or _PERSONAL_INFO_RE.search(folded):
+        result["warnings"].append("检测到可能的敏感信息，请谨慎使用")
     
     return result
 
 def format_timestamp(timestamp: Optional[datetime] = None) -> str:
     """格式化时间戳"""
     if timestamp is None:
-        timestamp = datetime.now()
-    return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        # 默认取当前时间，直接格式化本地时间，无需构造datetime对象
+        return time.strftime(_TIMESTAMP_FORMAT, time.localtime())
+    return timestamp.strftime(_TIMESTAMP_FORMAT)
 
 def truncate_text(text: str, max_length: int = 100) -> str:
     """截断文本"""
-    if len(text) <= max_length:
+    # 先切片：未超长时切片直接返回原对象，超长时复用切片结果拼接省略号
+    head = text[:max_length]
+    if head is text or len(text) <= max_length:
         return text
-    return text[:max_length-3] + "..."
+    return head[:-3] + "..."
 
 def calculate_improvement_percentage(original: float, improved: float) -> float:
     """计算改进百分比"""
@@ -81,6 +128,8 @@ def calculate_improvement_percentage(original: float, improved: float) -> float:
 def save_optimization_history(original_prompt: str, optimized_prompt: str, 
                              optimization_type: str, model: str):
     """保存优化历史记录"""
+    import streamlit as st
+    
     history_entry = {
         "timestamp": format_timestamp(),
         "original_prompt": truncate_text(original_prompt, 200),
@@ -89,47 +138,42 @@ def save_optimization_history(original_prompt: str, optimized_prompt: str,
         "model": model
     }
     
-    st.session_state.optimization_history.append(history_entry)
-    
-    # 限制历史记录数量
-    if len(st.session_state.optimization_history) > 50:
-        st.session_state.optimization_history = st.session_state.optimization_history[-50:]
+    # 限制历史记录数量，兼容旧会话中的列表
+    history = st.session_state.optimization_history
+    if not isinstance(history, deque):
+        history = st.session_state.optimization_history = deque(history, maxlen=_MAX_HISTORY)
+    history.append(history_entry)
 
 def export_results_to_text(results: Dict[str, Any]) -> str:
     """导出结果为文本格式"""
-    export_text = f"""
-提示词优化结果导出
-==================
-
-导出时间: {format_timestamp()}
-
-原始提示词:
-{results.get('original_prompt', 'N/A')}
-
-优化后提示词:
-{results.get('optimized_prompt', 'N/A')}
-
-优化类型: {results.get('optimization_type', 'N/A')}
-使用模型: {results.get('model_used', 'N/A')}
-
-优化建议:
-{chr(10).join(f"- {suggestion}" for suggestion in results.get('suggestions', []))}
-
-测试结果:
-{results.get('test_summary', '暂无测试结果')}
-"""
-    return export_text.strip()
-
-def create_download_link(content: str, filename: str, link_text: str = "下载") -> str:
-    """创建下载链接"""
-    import base64
+    suggestions = _NL.join("- " + str(suggestion) for suggestion in results.get('suggestions', []))
+    return _EXPORT_TMPL.substitute(
+        ts=format_timestamp(),
+        orig=results.get('original_prompt', 'N/A'),
+        opt=results.get('optimized_prompt', 'N/A'),
+        type=results.get('optimization_type', 'N/A'),
+        model=results.get('model_used', 'N/A'),
+        sugg=suggestions,
+        test=results.get('test_summary', '暂无测试结果')
+    ).strip()
+
+def create_download_link(content: str, filename: str, link_text: str = "下载") -> bool:
+    """
+    创建下载按钮
     
-    b64_content = base64.b64encode(content.encode()).decode()
-    href = f'<a href="data:text/plain;base64,{b64_content}" download="{filename}">{link_text}</a>'
-    return href
+    内容由Streamlit在服务端保存，点击时再传输，不再把base64数据内联到页面中
+    
+    Returns:
+        本次运行中按钮是否被点击
+    """
+    import streamlit as st
+    
+    return st.download_button(label=link_text, data=content, file_name=filename, mime="text/plain")
 
 def display_metric_card(title: str, value: str, delta: Optional[str] = None):
     """显示指标卡片"""
+    import streamlit as st
+    
     col1, col2, col3 = st.columns([2, 2, 1])
     
     with col1:
@@ -149,6 +193,8 @@ def display_metric_card(title: str, value: str, delta: Optional[str] = None):
 
 def show_success_message(message: str, duration: int = 3):
     """显示成功消息"""
+    import streamlit as st
+    
     success_placeholder = st.empty()
     success_placeholder.success(message)
     
@@ -157,6 +203,8 @@ def show_success_message(message: str, duration: int = 3):
 
 def show_error_message(message: str, details: Optional[str] = None):
     """显示错误消息"""
+    import streamlit as st
+    
     st.error(message)
     if details:
         with st.expander("错误详情"):
@@ -167,10 +215,6 @@ def format_file_size(size_bytes: int) -> str:
     if size_bytes == 0:
         return "0B"
     
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024
-        i += 1
-    
-    return f"{size_bytes:.1f}{size_names[i]}"
\ No newline at end of file
+    # 单位下标由二进制位数直接得出，每级 1024 = 2^10
+    i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1) if size_bytes >= 1024 else 0
+    return f"{size_bytes / (1 << (i * 10)):.1f}{_SIZE_UNITS[i]}"
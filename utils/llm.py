@@ -1,12 +1,18 @@
 import asyncio
+import atexit
+import dataclasses
+import hashlib
 import json
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List, Union, AsyncGenerator, Generator
-from dataclasses import dataclass, asdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from enum import Enum
-import requests
+from functools import lru_cache
+import httpx
 
 # 尝试导入可选依赖
 try:
@@ -24,12 +30,54 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from utils.cache import LRUCache
+from utils.compat import slotted_dataclass
 from utils.config import get_api_config, get_model_config, MODEL_CONFIG
 from core.models import ModelProvider
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# 请求/响应的JSON编解码，优先使用orjson
+if ORJSON_AVAILABLE:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    _json_loads = json.loads
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 精确匹配响应缓存的默认容量
+RESPONSE_CACHE_SIZE = 2048
+
+# 每个Ollama适配器缓存的options条目上限
+OPTIONS_CACHE_SIZE = 64
+
+# 进程内共享的适配器数量上限
+ADAPTER_CACHE_SIZE = 128
+
+# 批量调用的默认并发数，不应超过 aiohttp 连接器的 limit（100）
+BATCH_CONCURRENCY = 16
+
+# 语义缓存默认参数，可通过 UniversalModelClient 的 config 覆盖
+SEMANTIC_CACHE_EMBED_MODEL = "nomic-embed-text"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_TTL = 3600
+
+@slotted_dataclass
 class ModelResponse:
     """模型响应数据类"""
     content: str
@@ -43,7 +91,7 @@ class ModelResponse:
     metadata: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
-@dataclass
+@slotted_dataclass
 class GenerationConfig:
     """生成配置数据类"""
     temperature: float = 0.7
@@ -55,8 +103,22 @@ class GenerationConfig:
     system_prompt: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典，过滤None值"""
-        return {k: v for k, v in asdict(self).items() if v is not None}
+        """转换为字典，过滤None值（字段均为简单类型，直接读取属性，无需asdict深拷贝）"""
+        data = {
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+            "max_tokens": self.max_tokens,
+            "stop_sequences": self.stop_sequences,
+            "stream": self.stream,
+            "system_prompt": self.system_prompt
+        }
+        return {k: v for k, v in data.items() if v is not None}
+
+# 默认生成配置、可合并的字段及各字段默认值，合并配置时用于判断字段是否仍为默认值
+_DEFAULT_GENCONFIG = GenerationConfig()
+_MERGEABLE_FIELDS = frozenset(f.name for f in dataclasses.fields(GenerationConfig))
+_DEFAULTS = {f.name: f.default for f in dataclasses.fields(GenerationConfig)}
 
 class BaseModelAdapter(ABC):
     """模型适配器基类"""
@@ -88,13 +150,93 @@ class BaseModelAdapter(ABC):
         """异步聊天对话"""
         pass
     
+    async def stream_generate(self, prompt: str, config: Optional[GenerationConfig] = None,
+                              metadata: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
+        """流式生成文本，默认实现等待完整结果后一次性产出"""
+        response = await self.generate_async(prompt, config)
+        if not response.success:
+            raise RuntimeError(f"生成失败: {response.error}")
+        if metadata is not None and response.metadata:
+            metadata.update(response.metadata)
+        if response.content:
+            yield response.content
+    
     def check_availability(self) -> bool:
         """检查模型可用性"""
         return self.api_config is not None
+    
+    def _merge_config(self, config: Optional[GenerationConfig]) -> GenerationConfig:
+        """合并配置，返回值可能是共享的默认配置，调用方不应修改"""
+        # 从模型配置获取默认参数
+        default_params = self.model_config.get("parameters", {}) if self.model_config else {}
+        
+        # 未传入配置且模型没有默认参数时，直接使用共享的默认配置
+        if config is None and not default_params:
+            return _DEFAULT_GENCONFIG
+        
+        # 浅拷贝传入的配置，未传入时使用默认配置
+        merged = dataclasses.replace(config) if config else GenerationConfig()
+        
+        # 仍为默认值的字段应用模型默认参数
+        for key in _MERGEABLE_FIELDS & default_params.keys():
+            if getattr(merged, key) == _DEFAULTS[key]:
+                setattr(merged, key, default_params[key])
+        
+        return merged
+
+# 当前作用域共享的aiohttp会话，由 OllamaAdapter.session_scope() 设置
+_SCOPED_SESSION: "ContextVar[Optional[aiohttp.ClientSession]]" = ContextVar("ollama_aiohttp_session", default=None)
 
 class OllamaAdapter(BaseModelAdapter):
     """Ollama模型适配器"""
     
+    # 所有实例共享的同步连接池；异步会话的生命周期由 session_scope() 管理
+    _http_client: Optional[httpx.Client] = None
+    _http_client_lock = threading.Lock()
+    
+    @classmethod
+    def _get_http_client(cls) -> httpx.Client:
+        """获取共享的同步HTTP客户端，连接保持复用"""
+        if cls._http_client is None:
+            with cls._http_client_lock:
+                if cls._http_client is None:
+                    cls._http_client = httpx.Client(limits=httpx.Limits(max_keepalive_connections=32))
+                    atexit.register(cls._http_client.close)
+        return cls._http_client
+    
+    @staticmethod
+    @asynccontextmanager
+    async def session_scope():
+        """
+        在作用域内共享一个aiohttp会话，退出作用域时关闭
+        
+        已处于作用域内时直接复用外层会话；作用域外的单次异步请求使用临时会话，
+        请求结束即关闭，不会在事件循环结束后遗留未关闭的连接。
+        """
+        session = _SCOPED_SESSION.get()
+        if session is not None or not AIOHTTP_AVAILABLE:
+            yield session
+            return
+        
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60)
+        )
+        token = _SCOPED_SESSION.set(session)
+        try:
+            yield session
+        finally:
+            _SCOPED_SESSION.reset(token)
+            await session.close()
+    
+    @classmethod
+    def close(cls):
+        """关闭共享的同步HTTP客户端"""
+        with cls._http_client_lock:
+            if cls._http_client is not None:
+                cls._http_client.close()
+                cls._http_client = None
+
+    
     def __init__(self, model_name: str, config: Optional[Dict[str, Any]] = None):
         super().__init__(ModelProvider.OLLAMA, model_name, config)
         if not self.api_config:
@@ -102,155 +244,244 @@ class OllamaAdapter(BaseModelAdapter):
         
         self.base_url = self.api_config["base_url"]
         self.api_url = f"{self.base_url}/api"
+        # 各接口的完整URL只拼接一次
+        self._generate_url = f"{self.api_url}/generate"
+        self._chat_url = f"{self.api_url}/chat"
+        self._embeddings_url = f"{self.api_url}/embeddings"
         self.timeout = self.api_config.get("timeout", 60)
+        # 生成参数 -> Ollama options 的缓存，相同参数复用同一个字典
+        self._options_cache: Dict[tuple, Dict[str, Any]] = {}
     
     def generate(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """生成文本"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
-            # 合并配置
-            gen_config = self._merge_config(config)
-            
-            # 构建请求
-            data = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": self._build_ollama_options(gen_config)
-            }
-            
-            if gen_config.system_prompt:
-                data["system"] = gen_config.system_prompt
+            data = self._build_generate_data(prompt, self._merge_config(config))
             
             # 发送请求
-            response = requests.post(
-                f"{self.api_url}/generate",
-                json=data,
+            response = self._get_http_client().post(
+                self._generate_url,
+                content=_json_dumps(data),
+                headers=_JSON_HEADERS,
                 timeout=self.timeout
             )
             
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                result = response.json()
-                return ModelResponse(
-                    content=result.get("response", ""),
-                    model=self.model_name,
-                    provider=self.provider.value,
-                    success=True,
-                    response_time=response_time,
-                    tokens_used=result.get("eval_count"),
-                    tokens_prompt=result.get("prompt_eval_count"),
-                    metadata={
-                        "eval_duration": result.get("eval_duration"),
-                        "total_duration": result.get("total_duration")
-                    }
-                )
-            else:
-                return ModelResponse(
-                    content="",
-                    model=self.model_name,
-                    provider=self.provider.value,
-                    success=False,
-                    response_time=response_time,
-                    error=f"HTTP {response.status_code}: {response.text}"
-                )
+                return self._generate_response(_json_loads(response.content), response_time)
+            return self._error_response(f"HTTP {response.status_code}: {response.text}", response_time)
                 
         except Exception as e:
-            return ModelResponse(
-                content="",
-                model=self.model_name,
-                provider=self.provider.value,
-                success=False,
-                response_time=time.time() - start_time,
-                error=str(e)
-            )
+            return self._error_response(str(e), time.perf_counter() - start_time)
     
     async def generate_async(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步生成文本"""
-        # 在实际项目中，这里应该使用 aiohttp 等异步HTTP库
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.generate, prompt, config)
+        if not AIOHTTP_AVAILABLE:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.generate, prompt, config)
+        
+        start_time = time.perf_counter()
+        
+        try:
+            status, result = await self._apost(self._generate_url, self._build_generate_data(prompt, self._merge_config(config)))
+            response_time = time.perf_counter() - start_time
+            
+            if status == 200:
+                return self._generate_response(result, response_time)
+            return self._error_response(f"HTTP {status}: {result}", response_time)
+                
+        except Exception as e:
+            return self._error_response(str(e), time.perf_counter() - start_time)
     
     def chat(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """聊天对话"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
-            gen_config = self._merge_config(config)
+            data = self._build_chat_data(messages, self._merge_config(config))
             
-            data = {
-                "model": self.model_name,
-                "messages": messages,
-                "stream": False,
-                "options": self._build_ollama_options(gen_config)
-            }
-            
-            response = requests.post(
-                f"{self.api_url}/chat",
-                json=data,
+            response = self._get_http_client().post(
+                self._chat_url,
+                content=_json_dumps(data),
+                headers=_JSON_HEADERS,
                 timeout=self.timeout
             )
             
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
             
             if response.status_code == 200:
-                result = response.json()
-                return ModelResponse(
-                    content=result.get("message", {}).get("content", ""),
-                    model=self.model_name,
-                    provider=self.provider.value,
-                    success=True,
-                    response_time=response_time,
-                    metadata=result
-                )
-            else:
-                return ModelResponse(
-                    content="",
-                    model=self.model_name,
-                    provider=self.provider.value,
-                    success=False,
-                    response_time=response_time,
-                    error=f"HTTP {response.status_code}: {response.text}"
-                )
+                return self._chat_response(_json_loads(response.content), response_time)
+            return self._error_response(f"HTTP {response.status_code}: {response.text}", response_time)
                 
         except Exception as e:
-            return ModelResponse(
-                content="",
-                model=self.model_name,
-                provider=self.provider.value,
-                success=False,
-                response_time=time.time() - start_time,
-                error=str(e)
-            )
+            return self._error_response(str(e), time.perf_counter() - start_time)
     
     async def chat_async(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步聊天对话"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.chat, messages, config)
+        if not AIOHTTP_AVAILABLE:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.chat, messages, config)
+        
+        start_time = time.perf_counter()
+        
+        try:
+            status, result = await self._apost(self._chat_url, self._build_chat_data(messages, self._merge_config(config)))
+            response_time = time.perf_counter() - start_time
+            
+            if status == 200:
+                return self._chat_response(result, response_time)
+            return self._error_response(f"HTTP {status}: {result}", response_time)
+                
+        except Exception as e:
+            return self._error_response(str(e), time.perf_counter() - start_time)
     
-    def _merge_config(self, config: Optional[GenerationConfig]) -> GenerationConfig:
-        """合并配置"""
-        # 从模型配置获取默认参数
-        default_params = self.model_config.get("parameters", {}) if self.model_config else {}
+    async def stream_generate(self, prompt: str, config: Optional[GenerationConfig] = None,
+                              metadata: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
+        """
+        流式生成文本，按Ollama返回的NDJSON逐块产出
         
-        if config:
-            # 使用传入的配置
-            merged = GenerationConfig(**config.to_dict())
-        else:
-            # 使用默认配置
-            merged = GenerationConfig()
+        Args:
+            prompt: 输入提示
+            config: 生成配置
+            metadata: 可选字典，生成结束时写入最后一块中的统计信息（eval_count 等）
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp 包未安装，请运行: pip install aiohttp")
         
-        # 应用模型默认参数
-        for key, value in default_params.items():
-            if hasattr(merged, key) and getattr(merged, key) == getattr(GenerationConfig(), key):
-                setattr(merged, key, value)
+        data = self._build_generate_data(prompt, self._merge_config(config))
+        data["stream"] = True
         
-        return merged
+        async with self.session_scope() as session, session.post(
+            self._generate_url,
+            data=_json_dumps(data),
+            headers=_JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {await response.text()}")
+            
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                chunk = _json_loads(line)
+                text = chunk.get("response", "")
+                if text:
+                    yield text
+                if chunk.get("done"):
+                    if metadata is not None:
+                        metadata.update({
+                            "tokens_used": chunk.get("eval_count"),
+                            "tokens_prompt": chunk.get("prompt_eval_count"),
+                            "eval_duration": chunk.get("eval_duration"),
+                            "total_duration": chunk.get("total_duration")
+                        })
+                    break
+    
+    def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        """
+        调用Ollama的embedding接口获取文本向量
+        
+        Args:
+            text: 输入文本
+            model: 向量模型名称，默认使用当前模型
+        """
+        response = self._get_http_client().post(
+            self._embeddings_url,
+            content=_json_dumps({"model": model or self.model_name, "prompt": text}),
+            headers=_JSON_HEADERS,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return _json_loads(response.content)["embedding"]
+    
+    async def _apost(self, url: str, data: Dict[str, Any]) -> tuple:
+        """
+        通过当前作用域的aiohttp会话发送POST请求
+        
+        Returns:
+            (状态码, 响应内容)，状态码为200时为解析后的JSON，否则为响应文本
+        """
+        async with self.session_scope() as session, session.post(
+            url,
+            data=_json_dumps(data),
+            headers=_JSON_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            if response.status == 200:
+                return response.status, _json_loads(await response.read())
+            return response.status, await response.text()
+    
+    def _build_generate_data(self, prompt: str, gen_config: GenerationConfig) -> Dict[str, Any]:
+        """构建 /api/generate 请求体"""
+        data = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "options": self._build_ollama_options(gen_config)
+        }
+        
+        if gen_config.system_prompt:
+            data["system"] = gen_config.system_prompt
+        
+        return data
+    
+    def _build_chat_data(self, messages: List[Dict[str, str]], gen_config: GenerationConfig) -> Dict[str, Any]:
+        """构建 /api/chat 请求体"""
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": False,
+            "options": self._build_ollama_options(gen_config)
+        }
+    
+    def _generate_response(self, result: Dict[str, Any], response_time: float) -> ModelResponse:
+        """将 /api/generate 的结果转换为 ModelResponse"""
+        return ModelResponse(
+            content=result.get("response", ""),
+            model=self.model_name,
+            provider=self.provider.value,
+            success=True,
+            response_time=response_time,
+            tokens_used=result.get("eval_count"),
+            tokens_prompt=result.get("prompt_eval_count"),
+            metadata={
+                "eval_duration": result.get("eval_duration"),
+                "total_duration": result.get("total_duration")
+            }
+        )
+    
+    def _chat_response(self, result: Dict[str, Any], response_time: float) -> ModelResponse:
+        """将 /api/chat 的结果转换为 ModelResponse"""
+        return ModelResponse(
+            content=result.get("message", {}).get("content", ""),
+            model=self.model_name,
+            provider=self.provider.value,
+            success=True,
+            response_time=response_time,
+            metadata=result
+        )
+    
+    def _error_response(self, error: str, response_time: float) -> ModelResponse:
+        """构建失败响应"""
+        return ModelResponse(
+            content="",
+            model=self.model_name,
+            provider=self.provider.value,
+            success=False,
+            response_time=response_time,
+            error=error
+        )
     
     def _build_ollama_options(self, config: GenerationConfig) -> Dict[str, Any]:
-        """构建Ollama选项"""
+        """构建Ollama选项，按参数缓存，返回的字典不应被修改"""
+        key = (config.temperature, config.top_p, config.top_k, config.max_tokens,
+               tuple(config.stop_sequences or ()))
+        options = self._options_cache.get(key)
+        if options is not None:
+            return options
+        
         options = {
             "temperature": config.temperature,
             "top_p": config.top_p,
@@ -261,8 +492,12 @@ class OllamaAdapter(BaseModelAdapter):
             options["top_k"] = config.top_k
         
         if config.stop_sequences:
-            options["stop"] = config.stop_sequences
+            options["stop"] = list(config.stop_sequences)
         
+        # 超出容量时按写入顺序淘汰最早的条目
+        if len(self._options_cache) >= OPTIONS_CACHE_SIZE:
+            self._options_cache.pop(next(iter(self._options_cache)))
+        self._options_cache[key] = options
         return options
 
 class OpenAIAdapter(BaseModelAdapter):
@@ -281,6 +516,27 @@ class OpenAIAdapter(BaseModelAdapter):
             api_key=self.api_config["api_key"],
             base_url=self.api_config.get("base_url")
         )
+        # 异步客户端随适配器创建一次，复用其连接池
+        self.async_client = openai.AsyncOpenAI(
+            api_key=self.api_config["api_key"],
+            base_url=self.api_config.get("base_url"),
+            max_retries=2,
+            timeout=self.api_config.get("timeout", 60)
+        )
+    
+    async def aclose(self):
+        """关闭异步客户端，释放连接"""
+        await self.async_client.close()
+    
+    def __del__(self):
+        """适配器回收时，若事件循环仍在运行则异步关闭未关闭的客户端"""
+        async_client = getattr(self, "async_client", None)
+        if async_client is None or async_client.is_closed():
+            return
+        try:
+            asyncio.get_running_loop().create_task(async_client.close())
+        except RuntimeError:
+            pass
     
     def generate(self, prompt: str, config: Optional[GenerationConfig] = None) -> ModelResponse:
         """生成文本"""
@@ -301,26 +557,15 @@ class OpenAIAdapter(BaseModelAdapter):
     
     def chat(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """聊天对话"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             gen_config = self._merge_config(config)
             
-            kwargs = {
-                "model": self.model_name,
-                "messages": messages,
-                "temperature": gen_config.temperature,
-                "top_p": gen_config.top_p,
-                "max_tokens": gen_config.max_tokens,
-                "stream": gen_config.stream
-            }
-            
-            if gen_config.stop_sequences:
-                kwargs["stop"] = gen_config.stop_sequences
-            
+            kwargs = self._build_kwargs(messages, gen_config)
             response = self.client.chat.completions.create(**kwargs)
             
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
             
             return ModelResponse(
                 content=response.choices[0].message.content,
@@ -342,38 +587,21 @@ class OpenAIAdapter(BaseModelAdapter):
                 model=self.model_name,
                 provider=self.provider.value,
                 success=False,
-                response_time=time.time() - start_time,
+                response_time=time.perf_counter() - start_time,
                 error=str(e)
             )
     
     async def chat_async(self, messages: List[Dict[str, str]], config: Optional[GenerationConfig] = None) -> ModelResponse:
         """异步聊天对话"""
-        # 使用异步客户端
-        async_client = openai.AsyncOpenAI(
-            api_key=self.api_config["api_key"],
-            base_url=self.api_config.get("base_url")
-        )
-        
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             gen_config = self._merge_config(config)
             
-            kwargs = {
-                "model": self.model_name,
-                "messages": messages,
-                "temperature": gen_config.temperature,
-                "top_p": gen_config.top_p,
-                "max_tokens": gen_config.max_tokens,
-                "stream": gen_config.stream
-            }
-            
-            if gen_config.stop_sequences:
-                kwargs["stop"] = gen_config.stop_sequences
-            
-            response = await async_client.chat.completions.create(**kwargs)
+            kwargs = self._build_kwargs(messages, gen_config)
+            response = await self.async_client.chat.completions.create(**kwargs)
             
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
             
             return ModelResponse(
                 content=response.choices[0].message.content,
@@ -395,24 +623,40 @@ class OpenAIAdapter(BaseModelAdapter):
                 model=self.model_name,
                 provider=self.provider.value,
                 success=False,
-                response_time=time.time() - start_time,
+                response_time=time.perf_counter() - start_time,
                 error=str(e)
             )
     
-    def _merge_config(self, config: Optional[GenerationConfig]) -> GenerationConfig:
-        """合并配置"""
-        default_params = self.model_config.get("parameters", {}) if self.model_config else {}
-        
-        if config:
-            merged = GenerationConfig(**config.to_dict())
-        else:
-            merged = GenerationConfig()
+    def _build_kwargs(self, messages: List[Dict[str, str]], gen_config: GenerationConfig) -> Dict[str, Any]:
+        """构建 chat.completions.create 的请求参数"""
+        kwargs = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": gen_config.temperature,
+            "top_p": gen_config.top_p,
+            "max_tokens": gen_config.max_tokens,
+            "stream": gen_config.stream
+        }
         
-        for key, value in default_params.items():
-            if hasattr(merged, key) and getattr(merged, key) == getattr(GenerationConfig(), key):
-                setattr(merged, key, value)
+        if gen_config.stop_sequences:
+            kwargs["stop"] = gen_config.stop_sequences
         
-        return merged
+        return kwargs
+
+def _build_adapter(provider: ModelProvider, model_name: str, config: Dict[str, Any]) -> BaseModelAdapter:
+    """按提供商创建模型适配器"""
+    if provider == ModelProvider.OLLAMA:
+        return OllamaAdapter(model_name, config)
+    elif provider == ModelProvider.OPENAI:
+        return OpenAIAdapter(model_name, config)
+    # 可以继续添加其他提供商的适配器
+    else:
+        raise ValueError(f"不支持的提供商: {provider}")
+
+@lru_cache(maxsize=ADAPTER_CACHE_SIZE)
+def _shared_adapter(provider: ModelProvider, model_name: str, config_items: tuple) -> BaseModelAdapter:
+    """进程内共享的适配器，按 (提供商, 模型, 配置) 缓存"""
+    return _build_adapter(provider, model_name, dict(config_items))
 
 class UniversalModelClient:
     """通用模型客户端"""
@@ -420,7 +664,8 @@ class UniversalModelClient:
     def __init__(self, 
                  provider: Optional[Union[str, ModelProvider]] = None,
                  model_name: Optional[str] = None,
-                 config: Optional[Dict[str, Any]] = None):
+                 config: Optional[Dict[str, Any]] = None,
+                 cache_size: int = RESPONSE_CACHE_SIZE):
         """
         初始化通用模型客户端
         
@@ -428,9 +673,16 @@ class UniversalModelClient:
             provider: 模型提供商
             model_name: 模型名称
             config: 额外配置
+            cache_size: 响应缓存的最大条目数
         """
         self.config = config or {}
         self.adapters = {}
+        # (提供商, 模型, 输入, 生成配置) 完全相同的请求直接返回缓存的响应
+        self._response_cache = LRUCache(maxsize=cache_size)
+        # 语义缓存：config 中 semantic_cache 为真时启用，语义相近的提示词复用已有响应
+        self._semantic_cache = self._create_semantic_cache() if self.config.get("semantic_cache") else None
+        # async with 进入的会话作用域栈，支持嵌套进入
+        self._session_scopes = []
         
         # 如果指定了默认模型，创建适配器
         if provider and model_name:
@@ -439,28 +691,27 @@ class UniversalModelClient:
             self.default_adapter = None
     
     def _create_adapter(self, provider: Union[str, ModelProvider], model_name: str) -> BaseModelAdapter:
-        """创建模型适配器"""
+        """获取模型适配器，配置相同的客户端之间共享同一适配器及其连接池"""
         if isinstance(provider, str):
             provider = ModelProvider(provider)
         
-        adapter_key = f"{provider.value}:{model_name}"
-        
-        if adapter_key not in self.adapters:
-            if provider == ModelProvider.OLLAMA:
-                self.adapters[adapter_key] = OllamaAdapter(model_name, self.config)
-            elif provider == ModelProvider.OPENAI:
-                self.adapters[adapter_key] = OpenAIAdapter(model_name, self.config)
-            # 可以继续添加其他提供商的适配器
-            else:
-                raise ValueError(f"不支持的提供商: {provider}")
-        
-        return self.adapters[adapter_key]
+        try:
+            config_items = tuple(sorted(self.config.items()))
+            return _shared_adapter(provider, model_name, config_items)
+        except TypeError:
+            # 配置中包含不可哈希的值时，退回到客户端自己的适配器字典
+            adapter_key = (provider, model_name)
+            if adapter_key not in self.adapters:
+                self.adapters[adapter_key] = _build_adapter(provider, model_name, self.config)
+            return self.adapters[adapter_key]
     
     def generate(self, 
                  prompt: str,
                  provider: Optional[Union[str, ModelProvider]] = None,
                  model_name: Optional[str] = None,
-                 config: Optional[GenerationConfig] = None) -> ModelResponse:
+                 config: Optional[GenerationConfig] = None,
+                 cache: Optional[bool] = None,
+                 no_store: bool = False) -> ModelResponse:
         """
         生成文本
         
@@ -469,24 +720,59 @@ class UniversalModelClient:
             provider: 模型提供商（可选，使用默认）
             model_name: 模型名称（可选，使用默认）
             config: 生成配置
+            cache: 是否使用响应缓存，None时仅缓存temperature=0的确定性请求
+            no_store: 为True时可读取语义缓存，但不写入本次结果
         """
         adapter = self._get_adapter(provider, model_name)
-        return adapter.generate(prompt, config)
+        cache_key = self._response_cache_key(adapter, prompt, config, cache)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        use_semantic = self._use_semantic_cache(config, cache)
+        if use_semantic:
+            cached = self._semantic_lookup(adapter, prompt, config)
+            if cached is not None:
+                return cached
+        
+        response = self._store_response(cache_key, adapter.generate(prompt, config))
+        if use_semantic and not no_store:
+            self._semantic_store(adapter, prompt, response, config)
+        return response
     
     async def generate_async(self,
                            prompt: str,
                            provider: Optional[Union[str, ModelProvider]] = None,
                            model_name: Optional[str] = None,
-                           config: Optional[GenerationConfig] = None) -> ModelResponse:
+                           config: Optional[GenerationConfig] = None,
+                           cache: Optional[bool] = None,
+                           no_store: bool = False) -> ModelResponse:
         """异步生成文本"""
         adapter = self._get_adapter(provider, model_name)
-        return await adapter.generate_async(prompt, config)
+        cache_key = self._response_cache_key(adapter, prompt, config, cache)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        # 语义缓存的向量计算为同步调用，放到线程中执行
+        use_semantic = self._use_semantic_cache(config, cache)
+        if use_semantic:
+            loop = asyncio.get_running_loop()
+            cached = await loop.run_in_executor(None, self._semantic_lookup, adapter, prompt, config)
+            if cached is not None:
+                return cached
+        
+        response = self._store_response(cache_key, await adapter.generate_async(prompt, config))
+        if use_semantic and not no_store:
+            await loop.run_in_executor(None, self._semantic_store, adapter, prompt, response, config)
+        return response
     
     def chat(self,
              messages: List[Dict[str, str]],
              provider: Optional[Union[str, ModelProvider]] = None,
              model_name: Optional[str] = None,
-             config: Optional[GenerationConfig] = None) -> ModelResponse:
+             config: Optional[GenerationConfig] = None,
+             cache: Optional[bool] = None) -> ModelResponse:
         """
         聊天对话
         
@@ -495,18 +781,232 @@ class UniversalModelClient:
             provider: 模型提供商（可选）
             model_name: 模型名称（可选）
             config: 生成配置
+            cache: 是否使用响应缓存，None时仅缓存temperature=0的确定性请求
         """
         adapter = self._get_adapter(provider, model_name)
-        return adapter.chat(messages, config)
+        cache_key = self._response_cache_key(adapter, messages, config, cache)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        return self._store_response(cache_key, adapter.chat(messages, config))
     
     async def chat_async(self,
                         messages: List[Dict[str, str]],
                         provider: Optional[Union[str, ModelProvider]] = None,
                         model_name: Optional[str] = None,
-                        config: Optional[GenerationConfig] = None) -> ModelResponse:
+                        config: Optional[GenerationConfig] = None,
+                        cache: Optional[bool] = None) -> ModelResponse:
         """异步聊天对话"""
         adapter = self._get_adapter(provider, model_name)
-        return await adapter.chat_async(messages, config)
+        cache_key = self._response_cache_key(adapter, messages, config, cache)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        return self._store_response(cache_key, await adapter.chat_async(messages, config))
+    
+    async def stream_generate(self,
+                              prompt: str,
+                              provider: Optional[Union[str, ModelProvider]] = None,
+                              model_name: Optional[str] = None,
+                              config: Optional[GenerationConfig] = None,
+                              metadata: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
+        """
+        流式生成文本，不经过响应缓存
+        
+        Args:
+            prompt: 输入提示
+            provider: 模型提供商（可选）
+            model_name: 模型名称（可选）
+            config: 生成配置
+            metadata: 可选字典，生成结束时写入统计信息
+        """
+        adapter = self._get_adapter(provider, model_name)
+        async for text in adapter.stream_generate(prompt, config, metadata):
+            yield text
+    
+    async def __aenter__(self) -> "UniversalModelClient":
+        """进入异步上下文，作用域内的异步请求共享同一个aiohttp会话"""
+        scope = OllamaAdapter.session_scope()
+        await scope.__aenter__()
+        self._session_scopes.append(scope)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """退出异步上下文并关闭共享会话"""
+        await self._session_scopes.pop().__aexit__(exc_type, exc, tb)
+    
+    async def batch_generate(self,
+                             prompts: List[str],
+                             *,
+                             concurrency: int = BATCH_CONCURRENCY,
+                             provider: Optional[Union[str, ModelProvider]] = None,
+                             model_name: Optional[str] = None,
+                             config: Optional[GenerationConfig] = None) -> List[Union[ModelResponse, BaseException]]:
+        """
+        并发生成多个提示词的结果
+        
+        Args:
+            prompts: 提示词列表
+            concurrency: 最大并发数，不应超过 aiohttp 连接器的 limit
+            provider: 模型提供商（可选）
+            model_name: 模型名称（可选）
+            config: 生成配置
+            
+        Returns:
+            与输入顺序一致的结果列表，单个调用抛出的异常原样放在对应位置
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _one(prompt: str) -> ModelResponse:
+            async with semaphore:
+                return await self.generate_async(prompt, provider, model_name, config)
+        
+        async with OllamaAdapter.session_scope():
+            return await asyncio.gather(*(_one(prompt) for prompt in prompts), return_exceptions=True)
+    
+    async def batch_chat(self,
+                         conversations: List[List[Dict[str, str]]],
+                         *,
+                         concurrency: int = BATCH_CONCURRENCY,
+                         provider: Optional[Union[str, ModelProvider]] = None,
+                         model_name: Optional[str] = None,
+                         config: Optional[GenerationConfig] = None) -> List[Union[ModelResponse, BaseException]]:
+        """
+        并发执行多组聊天对话
+        
+        Args:
+            conversations: 消息列表的列表，每项为一次独立对话
+            concurrency: 最大并发数，不应超过 aiohttp 连接器的 limit
+            provider: 模型提供商（可选）
+            model_name: 模型名称（可选）
+            config: 生成配置
+            
+        Returns:
+            与输入顺序一致的结果列表，单个调用抛出的异常原样放在对应位置
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _one(messages: List[Dict[str, str]]) -> ModelResponse:
+            async with semaphore:
+                return await self.chat_async(messages, provider, model_name, config)
+        
+        async with OllamaAdapter.session_scope():
+            return await asyncio.gather(*(_one(messages) for messages in conversations), return_exceptions=True)
+    
+    def _response_cache_key(self,
+                            adapter: BaseModelAdapter,
+                            model_input: Union[str, List[Dict[str, str]]],
+                            config: Optional[GenerationConfig],
+                            cache: Optional[bool]) -> Optional[str]:
+        """
+        生成响应缓存键，不可缓存时返回None
+        
+        流式请求不缓存；cache为None时仅缓存temperature=0的请求，为True时总是缓存
+        """
+        if cache is False or (config is not None and config.stream):
+            return None
+        if cache is None and (config is None or config.temperature > 0):
+            return None
+        
+        payload = (
+            adapter.provider.value,
+            adapter.model_name,
+            model_input,
+            config.to_dict() if config is not None else None
+        )
+        return hashlib.sha256(_json_dumps(payload)).hexdigest()
+    
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[ModelResponse]:
+        """读取缓存的响应，命中时返回标记了cache_hit的副本"""
+        if cache_key is None:
+            return None
+        
+        response = self._response_cache.get(cache_key)
+        if response is None:
+            return None
+        
+        return dataclasses.replace(
+            response,
+            response_time=0.0,
+            metadata={**(response.metadata or {}), "cache_hit": True}
+        )
+    
+    def _store_response(self, cache_key: Optional[str], response: ModelResponse) -> ModelResponse:
+        """缓存成功的响应并原样返回"""
+        if cache_key is not None and response.success:
+            self._response_cache.set(cache_key, response)
+        return response
+    
+    def clear_response_cache(self):
+        """清空响应缓存"""
+        self._response_cache.clear()
+        if self._semantic_cache:
+            self._semantic_cache.clear()
+    
+    def _create_semantic_cache(self):
+        """创建以Ollama embedding为向量来源的语义缓存，依赖缺失或配置错误时返回None"""
+        try:
+            from services.semantic_cache import SemanticCache
+            
+            embed_model = self.config.get("semantic_cache_model", SEMANTIC_CACHE_EMBED_MODEL)
+            embedder = OllamaAdapter(embed_model, self.config)
+            return SemanticCache(
+                model=embed_model,
+                threshold=self.config.get("semantic_cache_threshold", SEMANTIC_CACHE_THRESHOLD),
+                ttl=self.config.get("semantic_cache_ttl", SEMANTIC_CACHE_TTL),
+                encoder=embedder.embed
+            )
+        except Exception as e:
+            logger.warning(f"语义缓存不可用，已跳过: {e}")
+            return None
+    
+    def _use_semantic_cache(self, config: Optional[GenerationConfig], cache: Optional[bool]) -> bool:
+        """是否对本次请求使用语义缓存，流式请求和显式关闭缓存时不使用"""
+        return (self._semantic_cache is not None and cache is not False
+                and not (config is not None and config.stream))
+    
+    @staticmethod
+    def _semantic_namespace(adapter: BaseModelAdapter, config: Optional[GenerationConfig] = None) -> str:
+        """
+        语义缓存命名空间，按 (提供商, 模型, 生成配置) 隔离
+        
+        system_prompt、max_tokens、stop_sequences 等不同时回答不可互用，
+        非默认配置以其哈希区分；与默认值相同的配置和不传配置共用命名空间。
+        """
+        namespace = f"{adapter.provider.value}:{adapter.model_name}"
+        if config is None or config == _DEFAULT_GENCONFIG:
+            return namespace
+        digest = hashlib.sha256(_json_dumps(config.to_dict())).hexdigest()[:16]
+        return f"{namespace}:{digest}"
+    
+    def _semantic_lookup(self, adapter: BaseModelAdapter, prompt: str,
+                         config: Optional[GenerationConfig] = None) -> Optional[ModelResponse]:
+        """查询语义缓存，命中时返回标记了semantic_hit的副本"""
+        try:
+            response = self._semantic_cache.lookup(prompt, namespace=self._semantic_namespace(adapter, config))
+        except Exception as e:
+            logger.warning(f"语义缓存查询失败: {e}")
+            return None
+        
+        if response is None:
+            return None
+        
+        return dataclasses.replace(
+            response,
+            response_time=0.0,
+            metadata={**(response.metadata or {}), "semantic_hit": True}
+        )
+    
+    def _semantic_store(self, adapter: BaseModelAdapter, prompt: str, response: ModelResponse,
+                        config: Optional[GenerationConfig] = None):
+        """将成功的响应写入语义缓存"""
+        if not response.success:
+            return
+        
+        try:
+            self._semantic_cache.insert(prompt, response, namespace=self._semantic_namespace(adapter, config))
+        except Exception as e:
+            logger.warning(f"语义缓存写入失败: {e}")
     
     def _get_adapter(self, provider: Optional[Union[str, ModelProvider]], model_name: Optional[str]) -> BaseModelAdapter:
         """获取适配器"""
@@ -522,9 +1022,9 @@ class UniversalModelClient:
         if provider:
             if isinstance(provider, str):
                 provider = ModelProvider(provider)
-            return {provider.value: MODEL_CONFIG.get(provider.value, {}).get("models", [])}
+            return {provider.value: list(MODEL_CONFIG.get(provider.value, {}).get("models", []))}
         else:
-            return {p.value: MODEL_CONFIG.get(p.value, {}).get("models", []) for p in ModelProvider}
+            return {p.value: list(MODEL_CONFIG.get(p.value, {}).get("models", [])) for p in ModelProvider}
     
     def check_model_availability(self, provider: Union[str, ModelProvider], model_name: str) -> bool:
         """检查模型可用性"""
@@ -536,6 +1036,18 @@ class UniversalModelClient:
 
 # LangChain 集成
 if LANGCHAIN_AVAILABLE:
+    # LangChain 消息类型 -> 对话角色
+    _LC_ROLE_MAP = {HumanMessage: "user", AIMessage: "assistant", SystemMessage: "system"}
+    
+    def _lc_role(message: BaseMessage) -> str:
+        """获取消息对应的角色，先按精确类型查表，子类再按 isinstance 匹配"""
+        role = _LC_ROLE_MAP.get(type(message))
+        if role is None:
+            role = next((r for cls, r in _LC_ROLE_MAP.items() if isinstance(message, cls)), None)
+            if role is None:
+                raise KeyError(f"不支持的消息类型: {type(message).__name__}")
+        return role
+    
     class UniversalLangChainLLM(LLM):
         """LangChain LLM 适配器"""
         
@@ -588,14 +1100,7 @@ if LANGCHAIN_AVAILABLE:
         
         def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> Any:
             # 转换消息格式
-            formatted_messages = []
-            for msg in messages:
-                if isinstance(msg, HumanMessage):
-                    formatted_messages.append({"role": "user", "content": msg.content})
-                elif isinstance(msg, AIMessage):
-                    formatted_messages.append({"role": "assistant", "content": msg.content})
-                elif isinstance(msg, SystemMessage):
-                    formatted_messages.append({"role": "system", "content": msg.content})
+            formatted_messages = [{"role": _lc_role(msg), "content": msg.content} for msg in messages]
             
             config = GenerationConfig(**{**self.generation_config.to_dict(), **kwargs})
             if stop:
@@ -609,10 +1114,34 @@ if LANGCHAIN_AVAILABLE:
             # 这里需要返回适当的LangChain格式，简化示例
             return response.content
 
-# 便捷函数
+# 便捷函数创建的客户端缓存: (提供商, 模型, 配置) -> 客户端
+CLIENT_CACHE_SIZE = 16
+_CLIENT_CACHE: Dict[tuple, UniversalModelClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
 def create_client(provider: str = "ollama", model: str = "llama3.2:latest", **config) -> UniversalModelClient:
-    """创建模型客户端的便捷函数"""
-    return UniversalModelClient(provider, model, config)
+    """创建模型客户端的便捷函数，相同参数复用已创建的客户端"""
+    try:
+        key = (provider, model, tuple(sorted(config.items())))
+        hash(key)
+    except TypeError:
+        # 配置中包含不可哈希的值时不缓存
+        return UniversalModelClient(provider, model, config)
+    
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = UniversalModelClient(provider, model, config)
+            # 超出容量时按创建顺序淘汰最早的客户端
+            if len(_CLIENT_CACHE) >= CLIENT_CACHE_SIZE:
+                _CLIENT_CACHE.pop(next(iter(_CLIENT_CACHE)))
+            _CLIENT_CACHE[key] = client
+        return client
+
+def clear_client_cache():
+    """清空便捷函数的客户端缓存"""
+    with _CLIENT_CACHE_LOCK:
+        _CLIENT_CACHE.clear()
 
 def quick_generate(prompt: str, provider: str = "ollama", model: str = "llama3.2:latest", **kwargs) -> str:
     """快速生成文本的便捷函数"""
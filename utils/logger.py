@@ -2,25 +2,259 @@
 日志工具模块
 """
 
+import atexit
+import gzip
+import inspect
 import logging
 import os
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+import queue
+import re
+import shutil
+import stat
+import struct
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, wraps
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Optional, Union
 from datetime import datetime
 
 from config.settings import LogConfig, AppConfig
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+# 结构化日志的JSON序列化，优先使用orjson（原生支持datetime）
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+else:
+    def _json_default(obj):
+        return obj.isoformat() if isinstance(obj, datetime) else str(obj)
+    
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=_json_default)
+
+# 级别名到整数的映射，键为大写，含 WARN/FATAL 别名，查找前先 upper()
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "WARN": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+    "FATAL": logging.CRITICAL,
+}
+_ROOT_LEVEL = _LEVELS.get(LogConfig.LEVEL.upper(), logging.INFO)
+
+# 控制台日志格式
+_CONSOLE_FORMAT = "%(levelname)s - %(name)s - %(message)s"
+
 # 全局日志配置
-_loggers = {}
 _initialized = False
+_init_lock = threading.Lock()
+# 后台写日志线程，实际的控制台/文件处理器都挂在它上面
+_queue_listener: Optional[QueueListener] = None
+# 初始化后的控制台/文件处理器
+_console_handler: Optional[logging.Handler] = None
+_file_handler: Optional[logging.Handler] = None
+# 只写文件、不输出到控制台的高频日志分类
+_file_only_loggers = set()
+
+# 文件日志写缓冲大小与强制刷新间隔（记录条数）
+_FILE_BUFFER_SIZE = 64 * 1024
+_FLUSH_EVERY = 100
+
+# FastFormatter 实现的格式，LogConfig.FORMAT 与之不同时使用标准格式器
+_FAST_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+class FastFormatter(logging.Formatter):
+    """
+    固定为 "时间 - 名称 - 级别 - 消息" 的格式器
+    
+    直接拼接 LogRecord 属性，不经过格式字符串解析；同一秒内的时间前缀只生成一次。
+    """
+    
+    def __init__(self):
+        super().__init__(_FAST_FORMAT)
+        self._cached_time = (None, "")
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, prefix = self._cached_time
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(record.created))
+            self._cached_time = (second, prefix)
+        return f"{prefix},{int(record.msecs):03d}"
+    
+    def format(self, record):
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record)
+        s = f"{record.asctime} - {record.name} - {record.levelname} - {record.message}"
+        
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            s = s + "\n" + record.exc_text
+        if record.stack_info:
+            s = s + "\n" + self.formatStack(record.stack_info)
+        return s
+
+# 滚动后的备份文件在单独线程中压缩，不阻塞写日志线程
+_COMPRESS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-gzip")
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+def _gzip_file(source: str, dest: str):
+    """
+    将 source 压缩为 dest 并删除 source
+    
+    失败时同时删除未压缩文件和不完整的 .gz：滚动逻辑只管理 .gz 备份，
+    留下的未压缩文件会游离在 backupCount 之外不断累积。
+    """
+    try:
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+    except Exception:
+        for path in (dest, source):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        # 与 Handler.handleError 一致，仅在 logging.raiseExceptions 开启时输出到 stderr
+        if logging.raiseExceptions:
+            sys.stderr.write(f"--- Logging error ---\n压缩日志备份失败，已丢弃: {source}\n")
+            traceback.print_exc(file=sys.stderr)
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    带写缓冲的滚动文件处理器
+    
+    记录先写入大缓冲区，WARNING 及以上级别或累计 flush_every 条后才刷新到磁盘。
+    标准实现每条记录都会 seek/tell 判断文件大小（强制刷新缓冲区）并检查文件类型，
+    这里改为打开文件时 fstat 一次，之后用计数器维护当前文件字节数。
+    compress=True 时备份文件以 .gz 保存，压缩在后台线程完成。
+    """
+    
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0,
+                 encoding=None, delay=False, errors=None,
+                 buffer_size: int = _FILE_BUFFER_SIZE, flush_every: int = _FLUSH_EVERY,
+                 compress: bool = False):
+        self.buffer_size = buffer_size
+        self.flush_every = flush_every
+        self._pending = 0
+        self._cursize = 0
+        self._regular = True
+        self._compress_future: Optional[Future] = None
+        # errors 参数 Python 3.9 起才被 FileHandler 支持，自行保存供 _open 使用
+        self._open_errors = errors
+        extra = {"errors": errors} if sys.version_info >= (3, 9) else {}
+        super().__init__(filename, mode, maxBytes, backupCount,
+                         encoding=encoding, delay=delay, **extra)
+        if compress:
+            # 备份文件名带 .gz 后缀，doRollover 的重命名和清理逻辑随之作用于压缩文件
+            self.namer = _gzip_namer
+            self.rotator = self._gzip_rotate
+    
+    def _gzip_rotate(self, source: str, dest: str):
+        """先同步改名腾出日志文件，再提交后台压缩"""
+        plain = dest[:-len(".gz")]
+        os.replace(source, plain)
+        try:
+            self._compress_future = _COMPRESS_EXECUTOR.submit(_gzip_file, plain, dest)
+        except RuntimeError:
+            # 解释器退出阶段线程池已关闭，改为同步压缩
+            _gzip_file(plain, dest)
+    
+    def doRollover(self):
+        # 上一次压缩未完成时先等待，避免备份序号移动时目标文件还在写入
+        if self._compress_future is not None:
+            self._compress_future.result()
+            self._compress_future = None
+        super().doRollover()
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                      encoding=self.encoding, errors=self._open_errors)
+        # 只在打开时访问一次文件系统，非普通文件（如 /dev/null）永不滚动
+        st = os.fstat(stream.fileno())
+        self._cursize = st.st_size
+        self._regular = stat.S_ISREG(st.st_mode)
+        self._pending = 0
+        return stream
+    
+    def _encoded_size(self, msg: str) -> int:
+        # 纯ASCII时字符数即字节数，否则按实际编码计算
+        return len(msg) if msg.isascii() else len(msg.encode(self.encoding or 'utf-8'))
+    
+    def _rollover_due(self, size: int) -> bool:
+        return (self.maxBytes > 0 and self._regular and self._cursize > 0
+                and self._cursize + size >= self.maxBytes)
+    
+    def shouldRollover(self, record):
+        """按计数器判断是否需要滚动，不访问文件系统"""
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return False
+        return self._rollover_due(self._encoded_size(self.format(record) + self.terminator))
+    
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                if self.mode != 'w' or not self._closed:
+                    self.stream = self._open()
+                else:
+                    return
+            
+            msg = self.format(record) + self.terminator
+            size = self._encoded_size(msg)
+            
+            if self._rollover_due(size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            
+            self.stream.write(msg)
+            self._cursize += size
+            self._pending += 1
+            
+            if record.levelno >= logging.WARNING or self._pending >= self.flush_every:
+                self._pending = 0
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
 def _init_logging():
     """初始化日志系统"""
-    global _initialized
-    
     if _initialized:
         return
     
+    # 双重检查，避免并发首次调用时重复添加处理器
+    with _init_lock:
+        if not _initialized:
+            _setup_handlers()
+
+def _setup_handlers():
+    """配置根日志器的处理器，调用方需持有 _init_lock"""
+    global _initialized, _queue_listener, _console_handler, _file_handler
+    
     # 创建日志目录
     log_dir = os.path.dirname(LogConfig.FILE_PATH)
     if log_dir and not os.path.exists(log_dir):
@@ -28,98 +262,156 @@ def _init_logging():
     
     # 配置根日志器
     root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, LogConfig.LEVEL))
+    root_logger.setLevel(_ROOT_LEVEL)
     
     # 清除现有处理器
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    _stop_queue_listener()
     
     # 创建格式器
-    formatter = logging.Formatter(LogConfig.FORMAT)
-    
-    # 控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO if not AppConfig.DEBUG else logging.DEBUG)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    if LogConfig.FORMAT == _FAST_FORMAT:
+        formatter = FastFormatter()
+    else:
+        formatter = logging.Formatter(LogConfig.FORMAT)
+    handlers = []
     
     # 文件处理器
+    file_handler = None
     if LogConfig.FILE_PATH:
         try:
-            file_handler = RotatingFileHandler(
+            file_handler = BufferedRotatingFileHandler(
                 LogConfig.FILE_PATH,
-                maxBytes=_parse_size(LogConfig.MAX_FILE_SIZE),
+                maxBytes=_MAX_BYTES,
                 backupCount=LogConfig.BACKUP_COUNT,
-                encoding='utf-8'
+                encoding='utf-8',
+                compress=LogConfig.COMPRESS_BACKUPS
             )
-            file_handler.setLevel(getattr(logging, LogConfig.LEVEL))
+            file_handler.setLevel(_ROOT_LEVEL)
             file_handler.setFormatter(formatter)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except Exception as e:
+            file_handler = None
             print(f"创建文件日志处理器失败: {e}")
     
+    # 控制台处理器，时间戳已在文件日志中，控制台使用精简格式
+    console_handler = None
+    if AppConfig.DEBUG or LogConfig.CONSOLE_ENABLED or file_handler is None:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setLevel(logging.INFO if not AppConfig.DEBUG else logging.DEBUG)
+        console_handler.setFormatter(logging.Formatter(_CONSOLE_FORMAT))
+        # 有文件处理器时，高频分类的记录不再经过控制台处理器的格式化和输出
+        if file_handler is not None:
+            console_handler.addFilter(lambda record: record.name not in _file_only_loggers)
+        handlers.append(console_handler)
+    _console_handler, _file_handler = console_handler, file_handler
+    
+    # 根日志器只挂队列处理器，调用线程只需入队，格式化和I/O由后台线程完成
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    
     _initialized = True
 
+def _set_file_only(name: str):
+    """将指定分类标记为只写入日志文件"""
+    _file_only_loggers.add(name)
+
+def _stop_queue_listener():
+    """停止后台日志线程，处理完队列中剩余的记录"""
+    global _queue_listener
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+# 先于 logging 自身的退出清理执行，保证队列中的记录落盘
+atexit.register(_stop_queue_listener)
+
+_SIZE_RE = re.compile(r'\s*(\d+)\s*(KB|MB|GB|B)?\s*', re.IGNORECASE)
+_SIZE_UNITS = {None: 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
 def _parse_size(size_str: str) -> int:
     """解析大小字符串，如 '10MB' -> 10485760"""
-    size_str = size_str.upper()
-    if size_str.endswith('KB'):
-        return int(size_str[:-2]) * 1024
-    elif size_str.endswith('MB'):
-        return int(size_str[:-2]) * 1024 * 1024
-    elif size_str.endswith('GB'):
-        return int(size_str[:-2]) * 1024 * 1024 * 1024
-    else:
-        return int(size_str)
+    m = _SIZE_RE.fullmatch(size_str)
+    if not m:
+        raise ValueError(f"无法解析的大小: {size_str!r}")
+    unit = m.group(2)
+    return int(m.group(1)) * _SIZE_UNITS[unit.upper() if unit else None]
+
+# 导入时解析一次，初始化时直接使用
+try:
+    _MAX_BYTES = _parse_size(LogConfig.MAX_FILE_SIZE)
+except ValueError as e:
+    print(f"日志文件大小配置无效，不进行滚动: {e}")
+    _MAX_BYTES = 0
+
+# 日志器按名称缓存，命中时只需一次哈希查找
+_cached_get_logger = lru_cache(maxsize=None)(logging.getLogger)
 
 def get_logger(name: str) -> logging.Logger:
     """获取指定名称的日志器"""
-    global _loggers
-    
     if not _initialized:
         _init_logging()
     
-    if name not in _loggers:
-        logger = logging.getLogger(name)
-        _loggers[name] = logger
-    
-    return _loggers[name]
+    return _cached_get_logger(name)
 
 class APICallLogger:
     """API调用日志器"""
     
     def __init__(self, logger_name: str = "api_calls"):
         self.logger = get_logger(logger_name)
+        _set_file_only(logger_name)
+        self._enabled = LogConfig.LOG_API_CALLS
+    
+    def refresh(self):
+        """运行时修改 LogConfig 后重新读取开关"""
+        self._enabled = LogConfig.LOG_API_CALLS
     
     def log_request(self, provider: str, model: str, prompt_length: int, **kwargs):
         """记录API请求"""
-        if not LogConfig.LOG_API_CALLS:
+        if not self._enabled:
             return
         
         self.logger.info(
-            f"API请求 - 提供商: {provider}, 模型: {model}, "
-            f"提示长度: {prompt_length}, 额外参数: {kwargs}"
+            "API请求 - 提供商: %s, 模型: %s, 提示长度: %d, 额外参数: %s",
+            provider, model, prompt_length, kwargs
         )
     
     def log_response(self, provider: str, model: str, success: bool, 
                     response_time: float, tokens_used: Optional[int] = None, **kwargs):
         """记录API响应"""
-        if not LogConfig.LOG_API_CALLS:
+        if not self._enabled or not self.logger.isEnabledFor(logging.INFO):
             return
         
         status = "成功" if success else "失败"
         token_info = f", tokens: {tokens_used}" if tokens_used else ""
         
         self.logger.info(
-            f"API响应 - 提供商: {provider}, 模型: {model}, "
-            f"状态: {status}, 用时: {response_time:.2f}s{token_info}"
+            "API响应 - 提供商: %s, 模型: %s, 状态: %s, 用时: %.2fs%s",
+            provider, model, status, response_time, token_info
+        )
+    
+    def log_call(self, provider: str, model: str, prompt_length: int, success: bool,
+                 response_time: float, tokens_used: Optional[int] = None, **kwargs):
+        """记录一次完整的API调用，请求与响应信息合并为一条记录"""
+        if not self._enabled or not self.logger.isEnabledFor(logging.INFO):
+            return
+        
+        status = "成功" if success else "失败"
+        token_info = f", tokens: {tokens_used}" if tokens_used else ""
+        
+        self.logger.info(
+            "API调用 - 提供商: %s, 模型: %s, 提示长度: %d, 状态: %s, 用时: %.2fs%s, 额外参数: %s",
+            provider, model, prompt_length, status, response_time, token_info, kwargs
         )
     
     def log_error(self, provider: str, model: str, error: str, **kwargs):
         """记录API错误"""
         self.logger.error(
-            f"API错误 - 提供商: {provider}, 模型: {model}, "
-            f"错误: {error}, 额外信息: {kwargs}"
+            "API错误 - 提供商: %s, 模型: %s, 错误: %s, 额外信息: %s",
+            provider, model, error, kwargs
         )
 
 class UserActionLogger:
@@ -127,72 +419,205 @@ class UserActionLogger:
     
     def __init__(self, logger_name: str = "user_actions"):
         self.logger = get_logger(logger_name)
+        _set_file_only(logger_name)
+        self._enabled = LogConfig.LOG_USER_ACTIONS
+    
+    def refresh(self):
+        """运行时修改 LogConfig 后重新读取开关"""
+        self._enabled = LogConfig.LOG_USER_ACTIONS
     
     def log_optimization(self, user_id: Optional[str], optimization_type: str, 
                         model: str, prompt_length: int, success: bool):
         """记录优化操作"""
-        if not LogConfig.LOG_USER_ACTIONS:
+        if not self._enabled or not self.logger.isEnabledFor(logging.INFO):
             return
         
-        user_info = f"用户: {user_id or 'anonymous'}"
-        status = "成功" if success else "失败"
-        
         self.logger.info(
-            f"优化操作 - {user_info}, 类型: {optimization_type}, "
-            f"模型: {model}, 提示长度: {prompt_length}, 状态: {status}"
+            "优化操作 - 用户: %s, 类型: %s, 模型: %s, 提示长度: %d, 状态: %s",
+            user_id or 'anonymous', optimization_type, model, prompt_length,
+            "成功" if success else "失败"
         )
     
     def log_test(self, user_id: Optional[str], model: str, test_length: int, success: bool):
         """记录测试操作"""
-        if not LogConfig.LOG_USER_ACTIONS:
+        if not self._enabled or not self.logger.isEnabledFor(logging.INFO):
             return
         
-        user_info = f"用户: {user_id or 'anonymous'}"
-        status = "成功" if success else "失败"
-        
         self.logger.info(
-            f"测试操作 - {user_info}, 模型: {model}, "
-            f"测试长度: {test_length}, 状态: {status}"
+            "测试操作 - 用户: %s, 模型: %s, 测试长度: %d, 状态: %s",
+            user_id or 'anonymous', model, test_length,
+            "成功" if success else "失败"
         )
     
     def log_session(self, session_id: str, action: str, **kwargs):
         """记录会话操作"""
-        if not LogConfig.LOG_USER_ACTIONS:
+        if not self._enabled or not self.logger.isEnabledFor(logging.INFO):
             return
         
         self.logger.info(
-            f"会话操作 - 会话ID: {session_id}, 动作: {action}, "
-            f"额外信息: {kwargs}"
+            "会话操作 - 会话ID: %s, 动作: %s, 额外信息: %s",
+            session_id, action, kwargs
         )
 
+# 二进制性能记录类型
+_PERF_EXECUTION_TIME = 1
+_PERF_MEMORY_USAGE = 2
+_PERF_TOKEN_USAGE = 3
+# 记录中整数字段为无符号32位
+_PERF_UINT_MAX = 0xFFFFFFFF
+
+class BinaryPerformanceHandler(logging.Handler):
+    """
+    二进制性能记录处理器
+    
+    每条记录为定长结构：时间戳、类型、两个名称ID、两个整数值、一个浮点值。
+    名称只在首次出现时分配ID并追加写入 <path>.names，记录中不重复写字符串。
+    """
+    
+    RECORD = struct.Struct("<dBIIIId")
+    
+    def __init__(self, path: str, buffer_size: int = _FILE_BUFFER_SIZE):
+        super().__init__()
+        log_dir = os.path.dirname(path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self.path = path
+        # 续写已有文件时沿用之前分配的名称ID
+        self._names = {name: name_id for name_id, name in self._load_names(path).items()}
+        self._stream = open(path, 'ab', buffering=buffer_size)
+        self._names_stream = open(path + ".names", 'a', encoding='utf-8')
+    
+    @staticmethod
+    def _load_names(path: str) -> dict:
+        names = {0: ""}
+        if os.path.exists(path + ".names"):
+            with open(path + ".names", encoding='utf-8') as f:
+                for line in f:
+                    name_id, _, name = line.rstrip("\n").partition("\t")
+                    names[int(name_id)] = name
+        return names
+    
+    def _intern(self, name: str) -> int:
+        name_id = self._names.get(name)
+        if name_id is None:
+            name_id = self._names[name] = len(self._names)
+            self._names_stream.write(f"{name_id}\t{name}\n")
+            self._names_stream.flush()
+        return name_id
+    
+    @staticmethod
+    def _to_uint(value) -> int:
+        """None 记为0，其余截断到无符号32位范围"""
+        if value is None:
+            return 0
+        return min(max(int(value), 0), _PERF_UINT_MAX)
+    
+    def _write(self, kind: int, name1: str, name2: str, int1, int2, value):
+        int1, int2 = self._to_uint(int1), self._to_uint(int2)
+        value = float("nan") if value is None else value
+        with self.lock:
+            self._stream.write(self.RECORD.pack(
+                time.time(), kind, self._intern(name1 or ""), self._intern(name2 or ""), int1, int2, value
+            ))
+    
+    def write(self, kind: int, name1: str, name2: str, int1: int, int2: int, value: float):
+        """直接写入一条记录，不经过 LogRecord 和格式化；写入失败交给 handleError 处理"""
+        try:
+            self._write(kind, name1, name2, int1, int2, value)
+        except Exception:
+            self.handleError(logging.makeLogRecord({
+                "name": "performance.binary", "msg": "二进制性能记录写入失败",
+                "args": None, "perf": (kind, name1, name2, int1, int2, value),
+            }))
+    
+    def emit(self, record):
+        """处理通过 extra={"perf": (kind, name1, name2, int1, int2, value)} 传入的记录"""
+        fields = getattr(record, "perf", None)
+        if fields is not None:
+            try:
+                self._write(*fields)
+            except Exception:
+                self.handleError(record)
+    
+    def flush(self):
+        with self.lock:
+            if not self._stream.closed:
+                self._stream.flush()
+    
+    def close(self):
+        with self.lock:
+            self._stream.close()
+            self._names_stream.close()
+        super().close()
+    
+    @classmethod
+    def read(cls, path: str):
+        """读取二进制性能日志，逐条返回名称已还原的元组"""
+        names = cls._load_names(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for ts, kind, id1, id2, int1, int2, value in cls.RECORD.iter_unpack(
+                data[:len(data) - len(data) % cls.RECORD.size]):
+            yield ts, kind, names.get(id1, ""), names.get(id2, ""), int1, int2, value
+
+@lru_cache(maxsize=1)
+def _get_binary_perf_handler() -> Optional[BinaryPerformanceHandler]:
+    """按配置创建共享的二进制性能处理器，未配置时返回 None"""
+    if not LogConfig.PERF_BINARY_PATH:
+        return None
+    try:
+        return BinaryPerformanceHandler(LogConfig.PERF_BINARY_PATH)
+    except OSError as e:
+        print(f"创建二进制性能日志失败: {e}")
+        return None
+
 class PerformanceLogger:
-    """性能日志器"""
+    """性能日志器，配置 PERF_BINARY_PATH 后不带上下文的记录写为二进制"""
     
     def __init__(self, logger_name: str = "performance"):
         self.logger = get_logger(logger_name)
+        self._binary = _get_binary_perf_handler()
     
     def log_execution_time(self, operation: str, execution_time: float, **context):
         """记录执行时间"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self._binary is not None and not context:
+            self._binary.write(_PERF_EXECUTION_TIME, operation, "", 0, 0, execution_time)
+            return
+        
         self.logger.info(
-            f"性能指标 - 操作: {operation}, 执行时间: {execution_time:.2f}s, "
-            f"上下文: {context}"
+            "性能指标 - 操作: %s, 执行时间: %.2fs, 上下文: %s",
+            operation, execution_time, context
         )
     
     def log_memory_usage(self, operation: str, memory_mb: float, **context):
         """记录内存使用"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self._binary is not None and not context:
+            self._binary.write(_PERF_MEMORY_USAGE, operation, "", 0, 0, memory_mb)
+            return
+        
         self.logger.info(
-            f"内存使用 - 操作: {operation}, 内存: {memory_mb:.2f}MB, "
-            f"上下文: {context}"
+            "内存使用 - 操作: %s, 内存: %.2fMB, 上下文: %s",
+            operation, memory_mb, context
         )
     
     def log_token_usage(self, provider: str, model: str, tokens_prompt: int, 
                        tokens_generated: int, cost: Optional[float] = None):
         """记录Token使用"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        if self._binary is not None:
+            self._binary.write(_PERF_TOKEN_USAGE, provider, model, tokens_prompt, tokens_generated, cost)
+            return
+        
         cost_info = f", 成本: ${cost:.4f}" if cost else ""
         
         self.logger.info(
-            f"Token使用 - 提供商: {provider}, 模型: {model}, "
-            f"输入: {tokens_prompt}, 输出: {tokens_generated}{cost_info}"
+            "Token使用 - 提供商: %s, 模型: %s, 输入: %s, 输出: %s%s",
+            provider, model, tokens_prompt, tokens_generated, cost_info
         )
 
 class StructuredLogger:
@@ -203,76 +628,133 @@ class StructuredLogger:
     
     def log_structured(self, level: str, event: str, **data):
         """记录结构化日志"""
-        import json
-        
         log_data = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "event": event,
             **data
         }
         
-        message = json.dumps(log_data, ensure_ascii=False, default=str)
+        message = _dumps(log_data)
         
-        log_level = getattr(logging, level.upper(), logging.INFO)
+        log_level = _LEVELS.get(level.upper(), logging.INFO) if isinstance(level, str) else level
         self.logger.log(log_level, message)
+    
+    def make_template(self, event: str, *value_keys: str, level: str = "info"):
+        """
+        为字段固定的高频事件创建日志函数
+        
+        事件名和字段名在此预先序列化，调用时只序列化时间戳和各字段值。
+        
+        Args:
+            event: 事件名
+            value_keys: 字段名，调用时按相同顺序传值
+            level: 日志级别
+            
+        Returns:
+            log(*values) 函数
+        """
+        event_part = ',"event":' + _dumps(event)
+        key_parts = tuple(',' + _dumps(key) + ':' for key in value_keys)
+        log_level = _LEVELS.get(level.upper(), logging.INFO) if isinstance(level, str) else level
+        logger = self.logger
+        
+        def log(*values):
+            if not logger.isEnabledFor(log_level):
+                return
+            
+            parts = ['{"timestamp":', _dumps(datetime.now()), event_part]
+            for key_part, value in zip(key_parts, values):
+                parts.append(key_part)
+                parts.append(_dumps(value))
+            parts.append('}')
+            logger.log(log_level, ''.join(parts))
+        
+        return log
 
 def log_function_call(func):
     """函数调用装饰器"""
     def decorator(func_obj):
+        logger = get_logger(func_obj.__module__)
+        func_name = func_obj.__name__
+        
+        @wraps(func_obj)
         def wrapper(*args, **kwargs):
-            logger = get_logger(func_obj.__module__)
-            func_name = func_obj.__name__
-            
             # 函数调用日志
             
             try:
-                start_time = datetime.now()
+                start_time = time.perf_counter()
                 result = func_obj(*args, **kwargs)
-                end_time = datetime.now()
-                
-                execution_time = (end_time - start_time).total_seconds()
+                execution_time = time.perf_counter() - start_time
                 # 函数执行完成
                 
                 return result
             except Exception as e:
-                logger.error(f"函数 {func_name} 执行失败: {str(e)}")
+                logger.error("函数 %s 执行失败: %s", func_name, e)
                 raise
         
         return wrapper
     
     return decorator(func) if callable(func) else decorator
 
-def log_api_call(provider: str, model: str):
-    """API调用装饰器"""
+def _prompt_length_getter(func, prompt_arg: Union[int, str, Callable[[tuple, dict], int]]):
+    """按函数签名预先生成提示长度的取值函数，调用时不再做类型判断"""
+    if callable(prompt_arg):
+        return prompt_arg
+    if isinstance(prompt_arg, int):
+        return lambda args, kwargs: len(args[prompt_arg])
+    
+    try:
+        index = list(inspect.signature(func).parameters).index(prompt_arg)
+    except (TypeError, ValueError):
+        return lambda args, kwargs: len(kwargs.get(prompt_arg, ""))
+    
+    return lambda args, kwargs: (
+        len(args[index]) if len(args) > index else len(kwargs.get(prompt_arg, ""))
+    )
+
+def log_api_call(provider: str, model: str, prompt_arg: Union[int, str, Callable[[tuple, dict], int]] = 0):
+    """
+    API调用装饰器，API调用日志关闭时直接返回原函数
+    
+    Args:
+        provider: 提供商
+        model: 模型名称
+        prompt_arg: 提示参数的位置索引或参数名，用于记录提示长度；
+            也可传入 (args, kwargs) -> int 的函数自行计算，如聊天消息的总字符数
+    """
     def decorator(func):
+        # 装饰时创建一次，调用时直接复用
+        api_logger_instance = APICallLogger()
+        if not api_logger_instance._enabled:
+            return func
+        
+        logger = api_logger_instance.logger
+        get_prompt_length = _prompt_length_getter(func, prompt_arg)
+        
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            api_logger = APICallLogger()
-            
-            # 记录请求
-            prompt_length = 0
-            if args and isinstance(args[0], str):
-                prompt_length = len(args[0])
-            
-            api_logger.log_request(provider, model, prompt_length)
+            try:
+                prompt_length = get_prompt_length(args, kwargs)
+            except (IndexError, KeyError, TypeError, AttributeError):
+                prompt_length = 0
             
             try:
-                start_time = datetime.now()
+                start_time = time.perf_counter()
                 result = func(*args, **kwargs)
-                end_time = datetime.now()
-                
-                response_time = (end_time - start_time).total_seconds()
-                
-                # 记录响应
-                success = getattr(result, 'success', True)
-                tokens_used = getattr(result, 'tokens_used', None)
+                response_time = time.perf_counter() - start_time
                 
-                api_logger.log_response(
-                    provider, model, success, response_time, tokens_used
-                )
+                # 请求与响应合并为一条记录，INFO 未开启时跳过属性探测
+                if logger.isEnabledFor(logging.INFO):
+                    api_logger_instance.log_call(
+                        provider, model, prompt_length,
+                        getattr(result, 'success', True),
+                        response_time,
+                        getattr(result, 'tokens_used', None)
+                    )
                 
                 return result
             except Exception as e:
-                api_logger.log_error(provider, model, str(e))
+                api_logger_instance.log_error(provider, model, str(e))
                 raise
         
         return wrapper
@@ -286,9 +768,12 @@ performance_logger = PerformanceLogger()
 # 导出主要类和函数
 __all__ = [
     "get_logger",
+    "BufferedRotatingFileHandler",
+    "FastFormatter",
     "APICallLogger",
     "UserActionLogger", 
     "PerformanceLogger",
+    "BinaryPerformanceHandler",
     "StructuredLogger",
     "log_function_call",
     "log_api_call",